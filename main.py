@@ -13,7 +13,7 @@ from managers.detection_manager import DetectionManager
 from managers.dashboard_manager import DashboardManager
 from managers.api_manager import APIManager
 from managers.database_manager import DatabaseManager
-from managers.storage_manager import start_snapshot_cleanup_thread
+from managers.storage_manager import SnapshotStorageManager, start_snapshot_cleanup_thread
 
 class ZVision:
     """
@@ -140,11 +140,16 @@ class ZVision:
         max_files = snapshot_config.get('max_files', 1000)
         cleanup_interval = snapshot_config.get('cleanup_interval', 3600)  # Default to hourly cleanup
         
+        # Let the detection manager report written snapshots to the storage manager's index
+        self.storage_manager = SnapshotStorageManager(max_files=max_files, logger=self.logger)
+        self.detection_manager.storage_manager = self.storage_manager
+        
         # Start the snapshot cleanup thread
-        self.snapshot_thread = start_snapshot_cleanup_thread(
+        self.snapshot_thread, self.snapshot_stop_event = start_snapshot_cleanup_thread(
             max_files=max_files,
             interval=cleanup_interval,
-            logger=self.logger
+            logger=self.logger,
+            storage_manager=self.storage_manager
         )
         self.logger.info(f"Snapshot storage manager started (max files: {max_files}, interval: {cleanup_interval}s)")
     
@@ -177,11 +182,11 @@ class ZVision:
         """Clean shutdown of all components"""
         self.logger.info("Shutting down ZVision system")
         
-        # First stop all detections
-        if hasattr(self.detection_manager, 'stop_all'):
+        # First stop all detections and flush pending snapshot writes
+        if hasattr(self.detection_manager, 'shutdown'):
             try:
                 self.logger.info("Stopping detection manager...")
-                self.detection_manager.stop_all()
+                self.detection_manager.shutdown()
                 self.logger.info("Detection manager stopped")
             except Exception as e:
                 self.logger.error(f"Error stopping detection manager: {e}")
@@ -202,6 +207,16 @@ class ZVision:
             except Exception as e:
                 self.logger.error(f"Error stopping camera manager: {e}")
         
+        # Stop the snapshot cleanup thread and the storage manager's executors
+        if hasattr(self, 'snapshot_stop_event'):
+            self.snapshot_stop_event.set()
+            self.snapshot_thread.join(timeout=5.0)
+        if hasattr(self, 'storage_manager'):
+            try:
+                self.storage_manager.shutdown()
+            except Exception as e:
+                self.logger.error(f"Error stopping snapshot storage manager: {e}")
+        
         # Finally, close the database
         if hasattr(self.db_manager, 'close'):
             try:
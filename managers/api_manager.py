@@ -184,7 +184,7 @@ class APIManager:
                     # Check if person is detected on this camera
                     person_detected = False
                     if self.detection_manager and camera_id in self.detection_manager.states:
-                        person_detected = self.detection_manager.states[camera_id].get("person_detected", False)
+                        person_detected = self.detection_manager.states[camera_id].person_detected
                     
                     camera_info = {
                         "id": camera_id,
@@ -256,20 +256,19 @@ class APIManager:
                 entry_direction = None
                 if self.detection_manager and camera_id in self.detection_manager.roi_settings:
                     roi = self.detection_manager.roi_settings[camera_id]
-                    if "coords" in roi:
+                    if roi.coords:
                         roi_settings = {
-                            "x1": roi["coords"][0],
-                            "y1": roi["coords"][1],
-                            "x2": roi["coords"][2],
-                            "y2": roi["coords"][3]
+                            "x1": roi.coords[0],
+                            "y1": roi.coords[1],
+                            "x2": roi.coords[2],
+                            "y2": roi.coords[3]
                         }
-                    if "entry_direction" in roi:
-                        entry_direction = roi["entry_direction"]
+                    entry_direction = roi.entry_direction
                 
                 # Check if person is detected on this camera
                 person_detected = False
                 if self.detection_manager and camera_id in self.detection_manager.states:
-                    person_detected = self.detection_manager.states[camera_id].get("person_detected", False)
+                    person_detected = self.detection_manager.states[camera_id].person_detected
                 
                 camera_info = {
                     "id": camera_id,
@@ -402,11 +401,11 @@ class APIManager:
                     # Get detection state if available
                     if camera_id in self.detection_manager.states:
                         state = self.detection_manager.states[camera_id]
-                        person_detected = state.get("person_detected", False)
-                        last_detection_time = state.get("last_detection_time")
+                        person_detected = state.person_detected
+                        last_detection_time = state.last_detection_time
                         
                         # Convert direction code to string
-                        dir_code = state.get("current_direction", self.detection_manager.DIRECTION_UNKNOWN)
+                        dir_code = state.current_direction
                         if dir_code == self.detection_manager.DIRECTION_LEFT_TO_RIGHT:
                             direction = "left_to_right"
                         elif dir_code == self.detection_manager.DIRECTION_RIGHT_TO_LEFT:
@@ -678,7 +677,56 @@ class APIManager:
             except Exception as e:
                 self.logger.error(f"Failed to clear ROI: {e}")
                 return jsonify({"success": False, "error": str(e)}), 500
-        
+
+        @self.app.route('/api/cameras/<camera_id>/roi/batch', methods=['POST'])
+        def batch_roi(camera_id):
+            # Apply a list of ROI operations in one request so clients can
+            # set/verify/clear without a round-trip per step
+            if not self.detection_manager:
+                self.logger.error("Detection manager not available")
+                return jsonify({"success": False, "error": "Detection manager not available"}), 500
+
+            try:
+                ops = request.get_json()
+                if not isinstance(ops, list):
+                    return jsonify({"success": False, "error": "Expected a list of operations"}), 400
+
+                camera_id = str(camera_id)
+                results = []
+                for op in ops:
+                    name = op.get('op') if isinstance(op, dict) else None
+                    try:
+                        if name == 'set':
+                            data = op.get('data') or {}
+                            roi = (data['x1'], data['y1'], data['x2'], data['y2'])
+                            ok = self.detection_manager.set_roi(camera_id, roi)
+                            if ok and 'entry_direction' in data:
+                                ok = self.detection_manager.set_entry_direction(camera_id, data['entry_direction'])
+                            results.append({"op": name, "success": bool(ok)})
+                        elif name == 'clear':
+                            ok = self.detection_manager.clear_roi(camera_id)
+                            results.append({"op": name, "success": bool(ok)})
+                        elif name in ('verify', 'get_status'):
+                            coords = self.detection_manager.get_roi(camera_id)
+                            results.append({
+                                "op": name,
+                                "success": True,
+                                "roi": {
+                                    "coords": dict(zip(("x1", "y1", "x2", "y2"), coords)) if coords else None,
+                                    "entry_direction": self.detection_manager.get_entry_direction(camera_id)
+                                }
+                            })
+                        else:
+                            results.append({"op": name, "success": False, "error": f"Unknown operation: {name}"})
+                    except Exception as e:
+                        results.append({"op": name, "success": False, "error": str(e)})
+
+                self.logger.info(f"Applied {len(results)} ROI operations for camera {camera_id} via API")
+                return jsonify({"success": all(r["success"] for r in results), "results": results})
+            except Exception as e:
+                self.logger.error(f"Failed to apply ROI batch: {e}")
+                return jsonify({"success": False, "error": str(e)}), 500
+
         # Analytics endpoints for multi-camera support
         
         # Compare metrics across cameras
@@ -57,6 +57,9 @@ class CameraManager:
         # Latest frame for direct access
         self.latest_frame = None
         self.frame_lock = threading.Lock()
+        # Signalled on frame_lock whenever latest_frame is replaced
+        self.frame_condition = threading.Condition(self.frame_lock)
+        self.frame_sequence = 0
         
         # Camera initialization lock to prevent race conditions
         self.initialization_lock = threading.RLock()
@@ -309,8 +312,10 @@ class CameraManager:
                                 frame = cv2.resize(frame, (self.width, self.height))
                             
                             # Update latest frame with thread safety
-                            with self.frame_lock:
+                            with self.frame_condition:
                                 self.latest_frame = frame.copy()
+                                self.frame_sequence += 1
+                                self.frame_condition.notify_all()
                             
                             # Put frame in queue, replacing any existing frame
                             try:
@@ -383,6 +388,22 @@ class CameraManager:
             if self.latest_frame is not None:
                 return self.latest_frame.copy()
             return None
+    
+    def wait_for_frame(self, timeout=None):
+        """
+        Wait for the next frame captured after this call
+        
+        Args:
+            timeout (float): Maximum time to wait in seconds (None means no timeout)
+            
+        Returns:
+            numpy.ndarray: Copy of the new frame, or None if none arrived in time
+        """
+        with self.frame_condition:
+            sequence = self.frame_sequence
+            if not self.frame_condition.wait_for(lambda: self.frame_sequence != sequence, timeout):
+                return None
+            return self.latest_frame.copy()
             
     def is_camera_active(self):
         """
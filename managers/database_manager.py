@@ -6,6 +6,7 @@ import sqlite3
 import threading
 import time
 import json
+from contextlib import closing
 from datetime import datetime, timedelta
 
 class DatabaseManager:
@@ -26,24 +27,45 @@ class DatabaseManager:
         # Get database path from config
         self.db_path = self.config.get('database', {}).get('path', 'database/zvision.db')
         
+        # SQLite URI filenames (e.g. "file:test?mode=memory&cache=shared") are opened as URIs
+        self.use_uri = self.db_path.startswith('file:')
+        
         # Ensure database directory exists
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        if not self.use_uri:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
         # Thread safety for database access
         self.db_lock = threading.Lock()
         
+        # A shared in-memory database only lives while a connection to it is open
+        self._memory_anchor = None
+        if self.use_uri and 'mode=memory' in self.db_path:
+            self._memory_anchor = self._connect(check_same_thread=False)
+        
         # Initialize database
         self._init_database()
         
         self.logger.info(f"DatabaseManager initialized with database at {self.db_path}")
     
+    def _connect(self, **kwargs):
+        """
+        Open a connection to the configured database
+        
+        Args:
+            **kwargs: Extra arguments for sqlite3.connect
+            
+        Returns:
+            sqlite3.Connection: New database connection
+        """
+        return sqlite3.connect(self.db_path, uri=self.use_uri, **kwargs)
+    
     def _init_database(self):
         """
         Initialize the database tables if they don't exist
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn = self._connect(check_same_thread=False)
                 conn.row_factory = sqlite3.Row  # Return rows as dictionaries
                 cursor = conn.cursor()
                 
@@ -91,6 +113,14 @@ class DatabaseManager:
                 CREATE INDEX IF NOT EXISTS idx_camera_ts ON detection_events(camera_id, timestamp)
                 ''')
                 
+                # Indexes for latest-events queries, optionally filtered by event type
+                cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_detection_events_type_ts ON detection_events(event_type, timestamp DESC)
+                ''')
+                cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_detection_events_ts ON detection_events(timestamp DESC)
+                ''')
+                
                 # Create system logs table
                 cursor.execute('''
                 CREATE TABLE IF NOT EXISTS system_logs (
@@ -159,7 +189,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # Convert data to JSON if it's a dict
@@ -182,6 +212,33 @@ class DatabaseManager:
                 self.logger.error(f"Error logging event: {e}")
                 return False
     
+    def log_events(self, events):
+        """
+        Log several general events in a single transaction
+        
+        Args:
+            events: Iterable of (event_type, data) pairs; data is converted to JSON
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        with self.db_lock:
+            try:
+                rows = [
+                    (event_type, json.dumps(data) if data is not None else None)
+                    for event_type, data in events
+                ]
+                
+                with closing(self._connect()) as conn, conn:
+                    conn.executemany("INSERT INTO events (type, data) VALUES (?, ?)", rows)
+                
+                self.logger.debug(f"Logged {len(rows)} events")
+                return True
+                
+            except Exception as e:
+                self.logger.error(f"Error logging events: {e}")
+                return False
+    
     def log_detection_event(self, event_type, direction=None, confidence=None, details=None, camera_id=None, snapshot_path=None):
         """
         Log a detection event to the database
@@ -199,7 +256,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # Ensure the detection_events table has a camera_id column
@@ -252,7 +309,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -284,7 +341,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 conn.row_factory = sqlite3.Row  # Return rows as dictionaries
                 cursor = conn.cursor()
                 
@@ -328,7 +385,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 conn.row_factory = sqlite3.Row  # Return rows as dictionaries
                 cursor = conn.cursor()
                 
@@ -360,7 +417,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
@@ -390,7 +447,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -421,7 +478,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # Calculate date threshold
@@ -452,10 +509,13 @@ class DatabaseManager:
     
     def close(self):
         """
-        Close database connection (if using a persistent connection)
+        Close the connection keeping a shared in-memory database alive, if any
         """
-        # Since we're using connection per operation, this is just a placeholder
-        # If we switch to a persistent connection, we would close it here
+        # Operations open their own connections; only the in-memory anchor persists
+        with self.db_lock:
+            if self._memory_anchor is not None:
+                self._memory_anchor.close()
+                self._memory_anchor = None
         self.logger.info("Database manager closed")
     
     def save_camera_roi(self, camera_id, roi, entry_dir):
@@ -472,7 +532,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -502,7 +562,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -536,7 +596,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 cursor.execute("DELETE FROM camera_config WHERE camera_id = ?;", (str(camera_id),))
@@ -580,7 +640,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # Add to cameras table (for backward compatibility)
@@ -632,7 +692,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # Check if the cameras table exists
@@ -667,7 +727,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 conn.row_factory = sqlite3.Row  # Return rows as dictionaries
                 cursor = conn.cursor()
                 
@@ -704,7 +764,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 conn.row_factory = sqlite3.Row  # Return rows as dictionaries
                 cursor = conn.cursor()
                 
@@ -747,7 +807,7 @@ class DatabaseManager:
         """
         with self.db_lock:
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # Check if the cameras table exists
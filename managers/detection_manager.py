@@ -5,12 +5,112 @@ import cv2
 import time
 import threading
 import numpy as np
+import torch
 from ultralytics import YOLO
-from collections import deque
+from collections import deque, namedtuple
 import logging
 import psutil
 import os
-from datetime import datetime
+import sys
+import concurrent.futures
+import queue
+
+# ROI configuration of a single camera; coords is None when no valid ROI is set
+RoiSetting = namedtuple('RoiSetting', ['coords', 'entry_direction'])
+
+def _intern_camera_id(camera_id):
+    """
+    Intern string camera IDs so repeated lookups hash and compare by identity
+    
+    Args:
+        camera_id: ID of the camera
+        
+    Returns:
+        The interned camera ID
+    """
+    return sys.intern(camera_id) if isinstance(camera_id, str) else camera_id
+
+class _RingBuffer:
+    """
+    Fixed-size ring buffer of float samples backed by a preallocated numpy array
+    """
+    
+    def __init__(self, capacity):
+        """
+        Initialize the ring buffer
+        
+        Args:
+            capacity: Maximum number of samples to keep
+        """
+        self._buffer = np.zeros(capacity, dtype=np.float32)
+        self._head = 0
+        self._sum = 0.0  # Running sum of the stored samples
+    
+    def append(self, value):
+        """
+        Add a sample, overwriting the oldest one when full
+        
+        Args:
+            value: Sample value
+        """
+        index = self._head % self._buffer.size
+        if self._head >= self._buffer.size:
+            self._sum -= float(self._buffer[index])
+        self._buffer[index] = value
+        self._sum += float(self._buffer[index])
+        self._head += 1
+    
+    def mean(self):
+        """
+        Get the average of the stored samples
+        
+        Returns:
+            float: Average value, or 0 if empty
+        """
+        count = len(self)
+        if count == 0:
+            return 0
+        return float(self._sum / count)
+    
+    def tolist(self):
+        """
+        Get the stored samples, oldest first
+        
+        Returns:
+            list: Sample values
+        """
+        count = len(self)
+        if count < self._buffer.size:
+            return self._buffer[:count].tolist()
+        start = self._head % self._buffer.size
+        if start == 0:
+            return self._buffer.tolist()
+        return np.concatenate((self._buffer[start:], self._buffer[:start])).tolist()
+    
+    def __len__(self):
+        return min(self._head, self._buffer.size)
+
+class _CameraState:
+    """
+    Detection state of a single camera
+    """
+    
+    __slots__ = (
+        'person_detected',
+        'last_detection_time',
+        'current_direction',
+        'no_person_counter',
+        'last_snapshot_time',
+        'snapshot_interval'
+    )
+    
+    def __init__(self):
+        self.person_detected = False
+        self.last_detection_time = None
+        self.current_direction = DetectionManager.DIRECTION_UNKNOWN
+        self.no_person_counter = 0
+        self.last_snapshot_time = 0  # Track last snapshot time
+        self.snapshot_interval = 1.0  # Take snapshot every 1 second
 
 class DetectionManager:
     """
@@ -22,9 +122,16 @@ class DetectionManager:
     DIRECTION_LEFT_TO_RIGHT = 1
     DIRECTION_RIGHT_TO_LEFT = 2
     
+    # Direction constant to string mapping
+    _DIRECTION_STRINGS = {
+        DIRECTION_LEFT_TO_RIGHT: "left_to_right",
+        DIRECTION_RIGHT_TO_LEFT: "right_to_left"
+    }
+    
     # Entry/Exit direction mapping constants
     ENTRY_DIRECTION_LTR = "LTR"  # Left-to-right is entry
     ENTRY_DIRECTION_RTL = "RTL"  # Right-to-left is entry
+    _VALID_ENTRY_DIRECTIONS = frozenset({ENTRY_DIRECTION_LTR, ENTRY_DIRECTION_RTL})
     
     def __init__(self, resource_provider, camera_registry, dashboard_manager=None, db_manager=None):
         """
@@ -42,6 +149,7 @@ class DetectionManager:
         self.dashboard_manager = dashboard_manager
         self.db_manager = db_manager
         self.api_manager = None  # Will be set by APIManager
+        self.storage_manager = None  # Optional SnapshotStorageManager notified of written snapshots
         
         # Extract detection settings from config
         detection_config = self.config.get('detection', {})
@@ -51,23 +159,64 @@ class DetectionManager:
         self.active_fps = detection_config.get('active_fps', 5)
         self.person_class_id = detection_config.get('person_class_id', 0)
         self.direction_threshold = detection_config.get('direction_threshold', 20)
+        self.precision = detection_config.get('precision', 'fp16')
+        self.max_workers = max(1, detection_config.get('max_workers', 4))
+        
+        # Model input size - frames are resized to this before inference
+        self._target_imgsz = 640
         
         # Dictionary to hold detection threads and states for each camera
+        # (each camera maps to the worker thread that serves it)
         self.detection_threads = {}
         self.states = {}
         self.position_history = {}
+        self._detected_cameras = set()  # Cameras whose state currently has person_detected set
         
         # ROI and entry/exit direction configurations per camera
         self.roi_settings = {}
         
+        # Recently confirmed cameras (camera ID -> expiry time) so back-to-back ROI/direction
+        # updates do not each query the camera registry
+        self._camera_exists_cache = {}
+        self._camera_exists_ttl = 1.0
+        
+        # Detection workers - each worker round-robins over a shard of cameras
+        self._shards = [[] for _ in range(self.max_workers)]
+        self._worker_threads = [None] * self.max_workers
+        self._shard_cond = threading.Condition()
+        self._in_flight = {}  # Shard index -> camera ID the worker is currently processing
+        
         # Global control
         self.is_running = False
         
         # Resource monitoring
-        self.cpu_usage_history = deque(maxlen=30)  # Keep last 30 readings
-        self.memory_usage_history = deque(maxlen=30)
+        self.cpu_usage_history = _RingBuffer(30)  # Keep last 30 readings
+        self.memory_usage_history = _RingBuffer(30)
         self.last_resource_check = 0
         self.resource_check_interval = 1.0  # Check every second
+        self._resource_lock = threading.Lock()
+        
+        # Prime the CPU counter so later non-blocking reads return usage since the previous call
+        psutil.cpu_percent(interval=None)
+        
+        # Snapshot storage
+        self._snapshot_root = "snapshots"
+        self._snapshot_dirs_created = set()  # Camera IDs whose snapshot directory exists
+        self._timestamp_prefix = (None, "")  # (epoch second, formatted date/time) of the last snapshot
+        
+        # Snapshot images are written in the background so disk I/O does not block inference
+        self._snapshot_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="snapshot-writer"
+        )
+        self._pending_snapshots = deque()  # Futures of queued snapshot writes, oldest first
+        self._max_pending_snapshots = 32
+        self._snapshot_lock = threading.Lock()
+        self._frame_pools = {}  # Frame shape/dtype -> LifoQueue of reusable snapshot buffers
+        
+        # Reusable payload dicts for events emitted via the API manager
+        self._event_dict_pool = []
+        self._max_pooled_event_dicts = 32
         
         # Load YOLOv8 model - shared across all cameras
         self._load_model()
@@ -80,11 +229,39 @@ class DetectionManager:
     def _load_model(self):
         """
         Load the YOLOv8 model
+        
+        Uses FP16 on CUDA devices by default ('precision: fp16'), or a TensorRT
+        engine exported next to the model file ('precision: engine').
         """
+        # Half precision and GPU preprocessing are only used on CUDA devices
+        self._device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self._half = self.precision in ('fp16', 'engine') and self._device == 'cuda'
+        self._gpu_preprocess_enabled = self._device == 'cuda'
+        
         try:
             self.logger.info(f"Loading YOLOv8 model from {self.model_path}...")
             self.model = YOLO(self.model_path)
-            self.logger.info(f"YOLOv8 model loaded successfully")
+            
+            precision = self.precision if self._half else 'fp32'
+            use_engine = self.precision == 'engine' and self._half
+            if use_engine:
+                # Use an existing FP16 TensorRT engine or export one once
+                try:
+                    engine_path = os.path.splitext(self.model_path)[0] + '.engine'
+                    if not os.path.exists(engine_path):
+                        self.logger.info(f"Exporting FP16 TensorRT engine to {engine_path}...")
+                        engine_path = self.model.export(format='engine', half=True, imgsz=self._target_imgsz)
+                    self.model = YOLO(engine_path)
+                except Exception as e:
+                    # TensorRT missing or export failed, keep the PyTorch model in FP16
+                    self.logger.warning(f"TensorRT engine unavailable, falling back to fp16: {e}")
+                    use_engine = False
+                    precision = 'fp16'
+            
+            if self._half and not use_engine:
+                self.model.to('cuda').half()
+            
+            self.logger.info(f"YOLOv8 model loaded successfully (precision: {precision})")
         except Exception as e:
             self.logger.error(f"Error loading YOLOv8 model: {e}")
             self.model = None
@@ -103,6 +280,14 @@ class DetectionManager:
         self.logger.info("Detection stop requested via API")
         return self.stop_all()
     
+    def shutdown(self):
+        """
+        Stop detection and wait for queued snapshot writes to finish
+        """
+        self.stop_all()
+        self._snapshot_executor.shutdown(wait=True)
+        self.logger.info("Snapshot writer stopped")
+    
     def start_all(self):
         """
         Start detection for all cameras
@@ -127,6 +312,9 @@ class DetectionManager:
         """
         Start detection for a specific camera
         
+        The camera is added to the shard of the least loaded detection worker;
+        the worker thread is started if it is not already running.
+        
         Args:
             camera_id: ID of the camera to start detection for
         """
@@ -139,37 +327,40 @@ class DetectionManager:
             self.logger.info(f"Starting camera {camera_id} first")
             camera.start()
         
-        # Check if we already have a thread for this camera
-        if camera_id in self.detection_threads and self.detection_threads[camera_id].is_alive():
-            self.logger.warning(f"Detection already running for camera {camera_id}")
-            return
-        
-        # Initialize state for this camera if it doesn't exist
-        if camera_id not in self.states:
-            self.states[camera_id] = {
-                "person_detected": False,
-                "last_detection_time": None,
-                "current_direction": self.DIRECTION_UNKNOWN,
-                "no_person_counter": 0,
-                "last_snapshot_time": 0,  # Track last snapshot time
-                "snapshot_interval": 1.0  # Take snapshot every 1 second
-            }
-        
-        # Initialize position history for direction tracking
-        if camera_id not in self.position_history:
-            self.position_history[camera_id] = deque(maxlen=20)
-        
-        # Start a detection thread for this camera
-        thread = threading.Thread(
-            target=self._run_detection_for_camera,
-            args=(camera_id,),
-            name=f"detection-{camera_id}"
-        )
-        thread.daemon = True
-        thread.start()
+        with self._shard_cond:
+            # Check if we already have a worker for this camera
+            if camera_id in self.detection_threads and self.detection_threads[camera_id].is_alive():
+                self.logger.warning(f"Detection already running for camera {camera_id}")
+                return
+            
+            # Initialize state for this camera if it doesn't exist
+            if camera_id not in self.states:
+                self.states[camera_id] = _CameraState()
+            
+            # Initialize position history for direction tracking
+            if camera_id not in self.position_history:
+                self.position_history[camera_id] = deque(maxlen=20)
+            
+            # Assign the camera to the least loaded worker
+            shard_idx = min(range(self.max_workers), key=lambda idx: len(self._shards[idx]))
+            self._shards[shard_idx].append(camera_id)
+            
+            # Start the worker thread for this shard if needed
+            thread = self._worker_threads[shard_idx]
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    args=(shard_idx,),
+                    name=f"detection-worker-{shard_idx}"
+                )
+                thread.daemon = True
+                thread.start()
+                self._worker_threads[shard_idx] = thread
+            
+            self.detection_threads[camera_id] = thread
+            self._shard_cond.notify_all()
         
-        self.detection_threads[camera_id] = thread
-        self.logger.info(f"Detection started for camera {camera_id}")
+        self.logger.info(f"Detection started for camera {camera_id} on worker {shard_idx}")
     
     def stop_all(self):
         """
@@ -177,21 +368,25 @@ class DetectionManager:
         """
         self.is_running = False
         
-        # Wait for all threads to stop
-        for camera_id, thread in list(self.detection_threads.items()):
+        with self._shard_cond:
+            # Empty the shards so workers exit, and give new workers fresh shard lists
+            for shard in self._shards:
+                shard.clear()
+            self._shards = [[] for _ in range(self.max_workers)]
+            workers = [thread for thread in self._worker_threads if thread is not None]
+            self._worker_threads = [None] * self.max_workers
+            self._shard_cond.notify_all()
+        
+        # Wait for all workers to stop
+        for thread in workers:
             if thread.is_alive():
                 thread.join(timeout=1.0)
-            
+        
+        for camera_id in list(self.detection_threads):
             # Reset detection state
             if camera_id in self.states:
-                self.states[camera_id] = {
-                    "person_detected": False,
-                    "last_detection_time": None,
-                    "current_direction": self.DIRECTION_UNKNOWN,
-                    "no_person_counter": 0,
-                    "last_snapshot_time": 0,  # Track last snapshot time
-                    "snapshot_interval": 1.0  # Take snapshot every 1 second
-                }
+                self.states[camera_id] = _CameraState()
+            self._detected_cameras.discard(camera_id)
             
             # Clear position history
             if camera_id in self.position_history:
@@ -211,122 +406,146 @@ class DetectionManager:
             self.logger.warning(f"No detection running for camera {camera_id}")
             return
         
-        # Mark thread for stopping
-        # The thread will check self.is_running and self.camera_registry.get_camera(camera_id).is_running
         thread = self.detection_threads[camera_id]
         
-        # Get the camera
-        camera = self.camera_registry.get_camera(camera_id)
-        if camera:
-            # Set a flag on the camera to stop detection
-            camera._stop_detection = True
-        
-        # Wait for the thread to stop
-        if thread.is_alive():
+        # Remove the camera from its worker's shard
+        shard_empty = False
+        with self._shard_cond:
+            for shard in self._shards:
+                if camera_id in shard:
+                    shard.remove(camera_id)
+                    shard_empty = not shard
+            self._shard_cond.notify_all()
+            
+            # Let a frame of this camera that is already being processed finish,
+            # so it cannot update the state after it has been reset below
+            if thread is not threading.current_thread():
+                self._shard_cond.wait_for(
+                    lambda: camera_id not in self._in_flight.values(),
+                    timeout=1.0
+                )
+        
+        # Wait for the worker to stop if it has no cameras left
+        if shard_empty and thread.is_alive() and thread is not threading.current_thread():
             thread.join(timeout=1.0)
         
         # Reset detection state
         if camera_id in self.states:
-            self.states[camera_id] = {
-                "person_detected": False,
-                "last_detection_time": None,
-                "current_direction": self.DIRECTION_UNKNOWN,
-                "no_person_counter": 0,
-                "last_snapshot_time": 0,  # Track last snapshot time
-                "snapshot_interval": 1.0  # Take snapshot every 1 second
-            }
+            self.states[camera_id] = _CameraState()
+        self._detected_cameras.discard(camera_id)
         
         # Clear position history
         if camera_id in self.position_history:
             self.position_history[camera_id].clear()
         
-        # Remove the thread reference
-        del self.detection_threads[camera_id]
-        
-        if camera:
-            # Clear the flag
-            camera._stop_detection = False
+        # Remove the thread reference (the worker may already have dropped it)
+        self.detection_threads.pop(camera_id, None)
         
         self.logger.info(f"Detection stopped for camera {camera_id}")
     
-    def _run_detection_for_camera(self, camera_id):
+    def _worker_loop(self, shard_idx):
         """
-        Run detection loop for a specific camera
+        Run the detection loop for a shard of cameras
+        
+        The worker round-robins over its cameras and only processes a frame for
+        cameras whose (resource adjusted) interval has elapsed. It exits when
+        detection is stopped or its shard becomes empty.
         
         Args:
-            camera_id: ID of the camera to run detection for
+            shard_idx: Index of the shard of cameras handled by this worker
         """
-        camera = self.camera_registry.get_camera(camera_id)
-        if not camera:
-            self.logger.error(f"Camera {camera_id} not available for detection")
-            return
-        
-        self.logger.info(f"Detection thread started for camera {camera_id}")
+        shard = self._shards[shard_idx]
+        self.logger.info(f"Detection worker {shard_idx} started")
         
         # Set up frame rate control
         frame_interval_idle = 1.0 / self.idle_fps if self.idle_fps > 0 else 1.0
         frame_interval_active = 1.0 / self.active_fps if self.active_fps > 0 else 0.2
         
-        last_frame_time = 0
-        
-        # Check if we have a state for this camera
-        if camera_id not in self.states:
-            self.states[camera_id] = {
-                "person_detected": False,
-                "last_detection_time": None,
-                "current_direction": self.DIRECTION_UNKNOWN,
-                "no_person_counter": 0,
-                "last_snapshot_time": 0,  # Track last snapshot time
-                "snapshot_interval": 1.0  # Take snapshot every 1 second
-            }
+        last_frame_times = {}
         
         # Detection loop
-        while self.is_running and camera.is_running and not getattr(camera, '_stop_detection', False):
-            try:
-                # Check system resources
-                self._check_system_resources()
-                
-                # Get current state for this camera
-                state = self.states[camera_id]
-                
-                # Determine processing rate
-                is_person_detected = state["person_detected"]
-                current_interval = frame_interval_active if is_person_detected else frame_interval_idle
-                
-                # Apply resource-based adjustments to frame rate
-                adjusted_interval = self._adjust_interval_based_on_resources(current_interval, camera_id)
-                
-                # Check if it's time to process the next frame
-                current_time = time.time()
-                if current_time - last_frame_time < adjusted_interval:
-                    time.sleep(0.01)  # Small sleep to avoid busy waiting
-                    continue
-                
-                last_frame_time = current_time
-                
-                # Get the latest frame
-                frame = camera.get_latest_frame()
-                if frame is None:
-                    # No frame available, sleep and try again
-                    time.sleep(0.1)
-                    continue
-                
-                # Process the frame
-                self._process_frame(frame, camera_id)
+        while True:
+            with self._shard_cond:
+                if not self.is_running or not shard:
+                    # Deregister while still holding the lock so start_camera
+                    # never assigns a camera to a worker that is exiting
+                    if self._worker_threads[shard_idx] is threading.current_thread():
+                        self._worker_threads[shard_idx] = None
+                    break
+                camera_ids = list(shard)
+            
+            # Read the clock once per iteration and share it with the helpers
+            now = time.monotonic()
+            
+            # Check system resources
+            self._check_system_resources(now)
+            
+            next_due = None
+            for camera_id in camera_ids:
+                with self._shard_cond:
+                    # Skip cameras stopped since the shard was copied
+                    if camera_id not in shard:
+                        continue
+                    self._in_flight[shard_idx] = camera_id
                 
-            except Exception as e:
-                self.logger.error(f"Error in detection loop for camera {camera_id}: {e}")
-                time.sleep(0.5)
+                try:
+                    camera = self.camera_registry.get_camera(camera_id)
+                    if not camera or not camera.is_running:
+                        # Camera went away, stop detection for it
+                        with self._shard_cond:
+                            if camera_id in shard:
+                                shard.remove(camera_id)
+                            self.detection_threads.pop(camera_id, None)
+                        self.logger.info(f"Camera {camera_id} not available, detection stopped")
+                        continue
+                    
+                    # Determine processing rate
+                    is_person_detected = self.states[camera_id].person_detected
+                    current_interval = frame_interval_active if is_person_detected else frame_interval_idle
+                    
+                    # Apply resource-based adjustments to frame rate
+                    adjusted_interval = self._adjust_interval_based_on_resources(current_interval, camera_id)
+                    
+                    # Check if it's time to process the next frame
+                    due = last_frame_times.get(camera_id, 0) + adjusted_interval
+                    if now < due:
+                        next_due = due if next_due is None else min(next_due, due)
+                        continue
+                    
+                    last_frame_times[camera_id] = now
+                    
+                    # Get the latest frame
+                    frame = camera.get_latest_frame()
+                    if frame is None:
+                        continue
+                    
+                    # Process the frame
+                    self._process_frame(frame, camera_id, now)
+                    
+                except Exception as e:
+                    self.logger.error(f"Error in detection loop for camera {camera_id}: {e}")
+                finally:
+                    with self._shard_cond:
+                        del self._in_flight[shard_idx]
+                        if camera_id not in shard:
+                            # Wake stop_camera waiting for this camera
+                            self._shard_cond.notify_all()
+            
+            # Sleep until the next camera is due, or until the shards change
+            timeout = 0.01 if next_due is None else max(0.0, next_due - time.monotonic())
+            with self._shard_cond:
+                self._shard_cond.wait(timeout)
         
-        self.logger.info(f"Detection thread stopped for camera {camera_id}")
+        self.logger.info(f"Detection worker {shard_idx} stopped")
     
-    def _process_frame(self, frame, camera_id):
+    def _process_frame(self, frame, camera_id, now=None):
         """
         Process a single frame for a specific camera
         
         Args:
             frame: The frame to process
             camera_id: ID of the camera this frame is from
+            now: Optional monotonic timestamp of the current loop iteration
         """
         if self.model is None:
             return
@@ -334,8 +553,42 @@ class DetectionManager:
         # Get frame dimensions for proper ROI scaling
         frame_height, frame_width = frame.shape[:2]
         
+        # Get ROI in frame pixel coordinates if ROI is set for this camera
+        roi_pixels = self._get_roi_pixels(camera_id, frame_width, frame_height)
+        
+        # Crop to the ROI (with tolerance) so inference only sees the region of interest
+        crop_x1, crop_y1, crop_x2, crop_y2 = 0, 0, frame_width, frame_height
+        if roi_pixels is not None:
+            # ROI coords are validated when set, so the crop is never empty
+            rx1, ry1, rx2, ry2, tolerance_x, tolerance_y = roi_pixels
+            crop_x1 = int(max(0, rx1 - tolerance_x))
+            crop_y1 = int(max(0, ry1 - tolerance_y))
+            crop_x2 = int(min(frame_width, rx2 + tolerance_x))
+            crop_y2 = int(min(frame_height, ry2 + tolerance_y))
+        
+        # Resize to the model input size ourselves so YOLO always sees the same shape
+        # and skips its own letterbox resize
+        if self._gpu_preprocess_enabled:
+            model_input = self._gpu_preprocess(frame, (crop_x1, crop_y1, crop_x2, crop_y2))
+        else:
+            model_input = cv2.resize(
+                frame[crop_y1:crop_y2, crop_x1:crop_x2],
+                (self._target_imgsz, self._target_imgsz),
+                interpolation=cv2.INTER_LINEAR
+            )
+        scale_x = (crop_x2 - crop_x1) / self._target_imgsz
+        scale_y = (crop_y2 - crop_y1) / self._target_imgsz
+        box_scale = np.array([scale_x, scale_y, scale_x, scale_y])
+        box_offset = np.array([crop_x1, crop_y1, crop_x1, crop_y1])
+        
         # Run YOLOv8 inference
-        results = self.model(frame, conf=self.confidence_threshold, verbose=False)
+        results = self.model(
+            model_input,
+            conf=self.confidence_threshold,
+            imgsz=self._target_imgsz,
+            half=self._half,
+            verbose=False
+        )
         
         # Check if any person is detected
         person_found = False
@@ -347,48 +600,16 @@ class DetectionManager:
                 # Check if detection is a person
                 cls = int(box.cls[0])
                 if cls == self.person_class_id:
-                    # Get bounding box: x1, y1, x2, y2
-                    xyxy = box.xyxy[0].cpu().numpy()
+                    # Get bounding box: x1, y1, x2, y2, mapped back to frame coordinates
+                    xyxy = box.xyxy[0].cpu().numpy() * box_scale + box_offset
                     
                     # Calculate center point
                     center_x = (xyxy[0] + xyxy[2]) / 2
                     center_y = (xyxy[1] + xyxy[3]) / 2
                     
-                    # Check if person is within ROI if ROI is set for this camera
-                    if camera_id in self.roi_settings and "coords" in self.roi_settings[camera_id]:
-                        # Get ROI coordinates
-                        roi_coords = self.roi_settings[camera_id]["coords"]
-                        
-                        # Convert ROI coordinates to numeric values (handle potential strings)
-                        rx1 = float(roi_coords[0])
-                        ry1 = float(roi_coords[1])
-                        rx2 = float(roi_coords[2])
-                        ry2 = float(roi_coords[3])
-                        
-                        # Add tolerance (2% of frame dimensions) to avoid edge cases
-                        tolerance_x = frame_width * 0.02
-                        tolerance_y = frame_height * 0.02
-                        
-                        # Default 320x240 canvas size used in frontend
-                        canvas_width = 320
-                        canvas_height = 240
-                        
-                        # Scale ROI coordinates from canvas to frame if needed
-                        if frame_width > 1.5 * canvas_width:  # Only scale if frame is significantly larger
-                            scale_x = frame_width / canvas_width
-                            scale_y = frame_height / canvas_height
-                            rx1 = rx1 * scale_x
-                            ry1 = ry1 * scale_y
-                            rx2 = rx2 * scale_x
-                            ry2 = ry2 * scale_y
-                        
-                        # Make sure coordinates are in valid range
-                        rx1 = max(0, min(rx1, frame_width))
-                        ry1 = max(0, min(ry1, frame_height))
-                        rx2 = max(0, min(rx2, frame_width))
-                        ry2 = max(0, min(ry2, frame_height))
-                        
-                        # Skip if person is outside ROI with tolerance
+                    # Skip if person is outside ROI with tolerance
+                    if roi_pixels is not None:
+                        rx1, ry1, rx2, ry2, tolerance_x, tolerance_y = roi_pixels
                         if not ((rx1 - tolerance_x) <= center_x <= (rx2 + tolerance_x) and 
                                 (ry1 - tolerance_y) <= center_y <= (ry2 + tolerance_y)):
                             continue
@@ -401,12 +622,91 @@ class DetectionManager:
                 break
         
         # Update detection state for this camera
-        self._update_detection_state(camera_id, person_found, frame, bbox_center_x)
+        self._update_detection_state(camera_id, person_found, frame, bbox_center_x, now)
+    
+    def _gpu_preprocess(self, frame, crop_box):
+        """
+        Crop, resize, convert BGR to RGB, transpose to CHW and normalize on the GPU
+        
+        The frame is uploaded once and every step runs on the device, producing
+        a tensor the model consumes directly without its own CPU preprocessing.
+        
+        Args:
+            frame: BGR frame (HWC, uint8)
+            crop_box: Tuple of (x1, y1, x2, y2) pixel coordinates to crop
+            
+        Returns:
+            torch.Tensor: Model input of shape (1, 3, imgsz, imgsz) in [0, 1]
+        """
+        x1, y1, x2, y2 = crop_box
+        tensor = torch.from_numpy(frame).to(self._device, non_blocking=True)
+        tensor = tensor[y1:y2, x1:x2].permute(2, 0, 1).flip(0).unsqueeze(0)
+        tensor = tensor.half() if self._half else tensor.float()
+        tensor = torch.nn.functional.interpolate(
+            tensor,
+            size=(self._target_imgsz, self._target_imgsz),
+            mode='bilinear',
+            align_corners=False
+        )
+        return tensor.div_(255.0)
+    
+    def _get_roi_pixels(self, camera_id, frame_width, frame_height):
+        """
+        Get the ROI for a camera in frame pixel coordinates
+        
+        Args:
+            camera_id: ID of the camera
+            frame_width: Width of the frame in pixels
+            frame_height: Height of the frame in pixels
+            
+        Returns:
+            tuple: (x1, y1, x2, y2, tolerance_x, tolerance_y) or None if no ROI is set
+        """
+        roi = self.roi_settings.get(camera_id)
+        if roi is None or roi.coords is None:
+            return None
+        
+        # Get ROI coordinates
+        roi_coords = roi.coords
+        
+        # Convert ROI coordinates to numeric values (handle potential strings)
+        rx1 = float(roi_coords[0])
+        ry1 = float(roi_coords[1])
+        rx2 = float(roi_coords[2])
+        ry2 = float(roi_coords[3])
+        
+        # Add tolerance (2% of frame dimensions) to avoid edge cases
+        tolerance_x = frame_width * 0.02
+        tolerance_y = frame_height * 0.02
+        
+        # Default 320x240 canvas size used in frontend
+        canvas_width = 320
+        canvas_height = 240
+        
+        # Scale ROI coordinates from canvas to frame if needed
+        if frame_width > 1.5 * canvas_width:  # Only scale if frame is significantly larger
+            scale_x = frame_width / canvas_width
+            scale_y = frame_height / canvas_height
+            rx1 = rx1 * scale_x
+            ry1 = ry1 * scale_y
+            rx2 = rx2 * scale_x
+            ry2 = ry2 * scale_y
+        
+        # Make sure coordinates are in valid range
+        rx1 = max(0, min(rx1, frame_width))
+        ry1 = max(0, min(ry1, frame_height))
+        rx2 = max(0, min(rx2, frame_width))
+        ry2 = max(0, min(ry2, frame_height))
+        
+        return rx1, ry1, rx2, ry2, tolerance_x, tolerance_y
     
     def _save_snapshot(self, camera_id, frame):
         """
         Save a snapshot image
         
+        The image is written by a background thread; the returned path is
+        final and can be stored right away.
+        
         Args:
             camera_id: ID of the camera
             frame: The frame to save
@@ -414,28 +714,99 @@ class DetectionManager:
         Returns:
             str: Path to the saved snapshot
         """
-        SNAPSHOT_DIR = "snapshots"
+        # Create camera-specific directory once per camera
+        camera_dir = os.path.join(self._snapshot_root, camera_id)
+        if camera_id not in self._snapshot_dirs_created:
+            os.makedirs(camera_dir, exist_ok=True)
+            self._snapshot_dirs_created.add(camera_id)
+        
+        # Generate timestamp for filename, formatting the date/time part once per second
+        seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+        cached_seconds, prefix = self._timestamp_prefix
+        if seconds != cached_seconds:
+            prefix = time.strftime("%Y%m%d_%H%M%S", time.localtime(seconds))
+            self._timestamp_prefix = (seconds, prefix)
+        filename = f"{camera_dir}/snapshot_{prefix}_{micros:06d}.jpg"
+        
+        with self._snapshot_lock:
+            # Drop finished writes; if the writer is falling behind, drop the oldest queued write
+            pending = self._pending_snapshots
+            while pending and pending[0].done():
+                pending.popleft()
+            if len(pending) >= self._max_pending_snapshots:
+                oldest = pending.popleft()
+                if oldest.cancel():
+                    self.logger.warning("Snapshot writer falling behind, dropped oldest queued snapshot")
+            
+            # Save the image off the detection thread; copy because the camera may reuse the buffer
+            buffer = self._acquire_frame_buffer(frame)
+            future = self._snapshot_executor.submit(self._write_snapshot, camera_id, filename, buffer)
+            future.add_done_callback(lambda _: self._release_frame_buffer(buffer))
+            pending.append(future)
         
-        # Create snapshots directory if it doesn't exist
-        if not os.path.exists(SNAPSHOT_DIR):
-            os.makedirs(SNAPSHOT_DIR)
+        return filename
+    
+    def _acquire_frame_buffer(self, frame):
+        """
+        Copy a frame into a pooled buffer of the same shape
         
-        # Create camera-specific directory
-        camera_dir = os.path.join(SNAPSHOT_DIR, camera_id)
-        if not os.path.exists(camera_dir):
-            os.makedirs(camera_dir)
+        Args:
+            frame: The frame to copy
             
-        # Generate timestamp for filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        filename = f"{camera_dir}/snapshot_{timestamp}.jpg"
+        Returns:
+            numpy.ndarray: Buffer holding a copy of the frame
+        """
+        key = (frame.shape, frame.dtype.str)
+        pool = self._frame_pools.get(key)
+        if pool is None:
+            pool = self._frame_pools.setdefault(key, queue.LifoQueue(maxsize=self._max_pending_snapshots))
         
-        # Save the image
-        cv2.imwrite(filename, frame)
-        self.logger.info(f"Snapshot saved: {filename}")
+        try:
+            buffer = pool.get_nowait()
+        except queue.Empty:
+            buffer = np.empty_like(frame)
         
-        return filename
+        np.copyto(buffer, frame)
+        return buffer
     
-    def _update_detection_state(self, camera_id, person_present, frame, center_x):
+    def _release_frame_buffer(self, buffer):
+        """
+        Return a snapshot buffer to its pool (dropped if the pool is full)
+        
+        Args:
+            buffer: Buffer obtained from _acquire_frame_buffer
+        """
+        pool = self._frame_pools.get((buffer.shape, buffer.dtype.str))
+        if pool is None:
+            return
+        try:
+            pool.put_nowait(buffer)
+        except queue.Full:
+            pass
+    
+    def _write_snapshot(self, camera_id, filename, frame):
+        """
+        Write a snapshot image to disk (runs on the snapshot writer pool)
+        
+        Args:
+            camera_id: ID of the camera the snapshot belongs to
+            filename: Path to write the snapshot to
+            frame: The frame to save
+        """
+        try:
+            if not cv2.imwrite(filename, frame):
+                self.logger.error("Error saving snapshot %s: write failed", filename)
+                return
+            self.logger.info("Snapshot saved: %s", filename)
+            
+            # Keep the storage manager's FIFO index up to date and let it clean up as captures accumulate
+            if self.storage_manager:
+                self.storage_manager.register(camera_id, filename)
+                self.storage_manager.notify_capture(camera_id)
+        except Exception as e:
+            self.logger.error("Error saving snapshot %s: %s", filename, e)
+    
+    def _update_detection_state(self, camera_id, person_present, frame, center_x, now=None):
         """
         Update detection state for a specific camera
         
@@ -444,29 +815,34 @@ class DetectionManager:
             person_present: Whether a person is present in the frame
             frame: The current frame
             center_x: X-coordinate of the person's bounding box center (or None)
+            now: Optional monotonic timestamp of the current loop iteration
         """
-        if camera_id not in self.states:
-            self.states[camera_id] = {
-                "person_detected": False,
-                "last_detection_time": None,
-                "current_direction": self.DIRECTION_UNKNOWN,
-                "no_person_counter": 0,
-                "last_snapshot_time": 0,  # Track last snapshot time
-                "snapshot_interval": 1.0  # Take snapshot every 1 second
-            }
+        state = self.states.get(camera_id)
+        if state is None:
+            state = self.states[camera_id] = _CameraState()
+        
+        # Idle steady state: no person now and none being tracked, nothing to update
+        if not person_present and not state.person_detected:
+            return
         
-        state = self.states[camera_id]
-        current_time = time.time()
+        if now is None:
+            now = time.monotonic()
         
         if person_present:
             # Check if this is a new detection or continuous detection
-            if not state["person_detected"]:
-                # Person has just appeared
-                state["person_detected"] = True
-                state["last_detection_time"] = current_time
-                state["current_direction"] = self.DIRECTION_UNKNOWN
-                state["no_person_counter"] = 0
-                state["last_snapshot_time"] = current_time
+            if not state.person_detected:
+                # Person has just appeared (unless this frame's camera was stopped
+                # while it was being processed, which must not mark it detected again)
+                with self._shard_cond:
+                    if (camera_id in self._in_flight.values()
+                            and not any(camera_id in shard for shard in self._shards)):
+                        return
+                    state.person_detected = True
+                    self._detected_cameras.add(camera_id)
+                state.last_detection_time = time.time()  # Wall clock, reported via the API
+                state.current_direction = self.DIRECTION_UNKNOWN
+                state.no_person_counter = 0
+                state.last_snapshot_time = now
                 
                 # Save initial detection snapshot
                 snapshot_path = self._save_snapshot(camera_id, frame)
@@ -484,21 +860,17 @@ class DetectionManager:
                     )
                 
                 # Emit event via API manager
-                if self.api_manager:
-                    self.api_manager.emit_event(
-                        "detection_start", 
-                        {"camera": camera_id}
-                    )
+                self._emit_event("detection_start", camera=camera_id)
                 
-                self.logger.info(f"Person detected on camera {camera_id}")
+                self.logger.info("Person detected on camera %s", camera_id)
             else:
                 # Continuous detection - capture snapshot every interval
-                time_since_last_snapshot = current_time - state["last_snapshot_time"]
+                time_since_last_snapshot = now - state.last_snapshot_time
                 
-                if time_since_last_snapshot >= state["snapshot_interval"]:
+                if time_since_last_snapshot >= state.snapshot_interval:
                     # Time to take another snapshot
                     snapshot_path = self._save_snapshot(camera_id, frame)
-                    state["last_snapshot_time"] = current_time
+                    state.last_snapshot_time = now
                     
                     # Optionally log continuing detection
                     if self.db_manager:
@@ -508,21 +880,22 @@ class DetectionManager:
                             snapshot_path=snapshot_path
                         )
                     
-                    self.logger.debug(f"Continuous snapshot saved for camera {camera_id}")
+                    self.logger.debug("Continuous snapshot saved for camera %s", camera_id)
             
             # Track position for direction detection
             if center_x is not None:
-                self._record_position(camera_id, center_x)
+                self._record_position(camera_id, center_x, now)
         else:
             # No person detected in this frame
-            if state["person_detected"]:
+            if state.person_detected:
                 # Increment the counter for consecutive frames without a person
-                state["no_person_counter"] += 1
+                state.no_person_counter += 1
                 
                 # If no person for several consecutive frames, consider the person gone
-                if state["no_person_counter"] >= 5:
+                if state.no_person_counter >= 5:
                     # Person has disappeared
-                    state["person_detected"] = False
+                    state.person_detected = False
+                    self._detected_cameras.discard(camera_id)
                     
                     # Save snapshot when person is no longer detected
                     snapshot_path = self._save_snapshot(camera_id, frame)
@@ -532,8 +905,9 @@ class DetectionManager:
                     
                     # Determine if this was an entry or exit based on direction and configuration
                     event_type = "detection_end"
-                    if camera_id in self.roi_settings and "entry_direction" in self.roi_settings[camera_id]:
-                        entry_dir = self.roi_settings[camera_id]["entry_direction"]
+                    roi = self.roi_settings.get(camera_id)
+                    if roi is not None and roi.entry_direction:
+                        entry_dir = roi.entry_direction
                         if direction_str == "left_to_right":
                             event_type = "entry" if entry_dir == "LTR" else "exit"
                         elif direction_str == "right_to_left":
@@ -557,32 +931,27 @@ class DetectionManager:
                         )
                     
                     # Emit event via API manager
-                    if self.api_manager:
-                        self.api_manager.emit_event(
-                            event_type, 
-                            {
-                                "camera": camera_id,
-                                "event": event_type,
-                                "direction": direction_str
-                            }
-                        )
+                    self._emit_event(event_type, camera=camera_id, event=event_type, direction=direction_str)
                     
-                    self.logger.info(f"Person no longer detected on camera {camera_id}, direction: {direction_str}, event: {event_type}")
+                    self.logger.info("Person no longer detected on camera %s, direction: %s, event: %s", camera_id, direction_str, event_type)
     
-    def _record_position(self, camera_id, center_x):
+    def _record_position(self, camera_id, center_x, now=None):
         """
         Record the position of a person for direction tracking
         
         Args:
             camera_id: ID of the camera
             center_x: X-coordinate of the person's bounding box center
+            now: Optional monotonic timestamp of the current loop iteration
         """
         # Ensure we have a position history for this camera
         if camera_id not in self.position_history:
             self.position_history[camera_id] = deque(maxlen=20)
         
         # Add current position to history
-        self.position_history[camera_id].append((time.time(), center_x))
+        if now is None:
+            now = time.monotonic()
+        self.position_history[camera_id].append((now, center_x))
         
         # Update direction if we have enough positions
         if len(self.position_history[camera_id]) >= 3:
@@ -616,7 +985,7 @@ class DetectionManager:
         
         # Only update direction if movement exceeds threshold
         if abs(movement) >= self.direction_threshold:
-            prev_direction = self.states[camera_id]["current_direction"]
+            prev_direction = self.states[camera_id].current_direction
             
             # Determine new direction
             new_direction = (
@@ -626,21 +995,41 @@ class DetectionManager:
             
             # Update state if direction changed
             if prev_direction != new_direction:
-                self.states[camera_id]["current_direction"] = new_direction
+                self.states[camera_id].current_direction = new_direction
                 
                 # Log direction change
                 direction_str = self._direction_to_string(new_direction)
-                self.logger.info(f"Direction updated for camera {camera_id}: {direction_str}")
+                self.logger.info("Direction updated for camera %s: %s", camera_id, direction_str)
                 
                 # Emit direction event via API manager
-                if self.api_manager:
-                    self.api_manager.emit_event(
-                        "direction", 
-                        {
-                            "camera": camera_id,
-                            "direction": direction_str
-                        }
-                    )
+                self._emit_event("direction", camera=camera_id, direction=direction_str)
+    
+    def _emit_event(self, event_type, **fields):
+        """
+        Emit an event via the API manager using a pooled payload dict
+        
+        The API manager serializes the payload before emit_event returns,
+        so the dict can be cleared and reused for the next event.
+        
+        Args:
+            event_type: Type of the event
+            **fields: Payload fields
+        """
+        if not self.api_manager:
+            return
+        
+        try:
+            data = self._event_dict_pool.pop()
+        except IndexError:
+            data = {}
+        
+        data.update(fields)
+        try:
+            self.api_manager.emit_event(event_type, data)
+        finally:
+            data.clear()
+            if len(self._event_dict_pool) < self._max_pooled_event_dicts:
+                self._event_dict_pool.append(data)
     
     def _direction_to_string(self, direction):
         """
@@ -652,12 +1041,7 @@ class DetectionManager:
         Returns:
             str: Direction string
         """
-        if direction == self.DIRECTION_LEFT_TO_RIGHT:
-            return "left_to_right"
-        elif direction == self.DIRECTION_RIGHT_TO_LEFT:
-            return "right_to_left"
-        else:
-            return "unknown"
+        return self._DIRECTION_STRINGS.get(direction, "unknown")
     
     def _get_direction_string(self, camera_id):
         """
@@ -670,24 +1054,32 @@ class DetectionManager:
             str: Direction string
         """
         if camera_id in self.states:
-            return self._direction_to_string(self.states[camera_id]["current_direction"])
+            return self._direction_to_string(self.states[camera_id].current_direction)
         return "unknown"
     
-    def _check_system_resources(self):
+    def _check_system_resources(self, now=None):
         """
         Check system CPU and memory usage
+        
+        Args:
+            now: Optional monotonic timestamp of the current loop iteration
         """
-        current_time = time.time()
+        if now is None:
+            now = time.monotonic()
         
-        # Only check periodically to avoid overhead
-        if current_time - self.last_resource_check < self.resource_check_interval:
+        # Only check periodically to avoid overhead; one worker samples for all cameras
+        if now - self.last_resource_check < self.resource_check_interval:
+            return
+        if not self._resource_lock.acquire(blocking=False):
             return
-        
-        self.last_resource_check = current_time
         
         try:
-            # Get CPU and memory usage
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            if now - self.last_resource_check < self.resource_check_interval:
+                return
+            self.last_resource_check = now
+            
+            # Get CPU and memory usage (non-blocking: usage since the previous call)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory_percent = psutil.virtual_memory().percent
             
             # Add to history
@@ -696,12 +1088,14 @@ class DetectionManager:
             
             # Log high resource usage
             if cpu_percent > 90:
-                self.logger.warning(f"High CPU usage: {cpu_percent}%")
+                self.logger.warning("High CPU usage: %s%%", cpu_percent)
             if memory_percent > 90:
-                self.logger.warning(f"High memory usage: {memory_percent}%")
+                self.logger.warning("High memory usage: %s%%", memory_percent)
                 
         except Exception as e:
-            self.logger.error(f"Error checking system resources: {e}")
+            self.logger.error("Error checking system resources: %s", e)
+        finally:
+            self._resource_lock.release()
     
     def _adjust_interval_based_on_resources(self, base_interval, camera_id):
         """
@@ -719,7 +1113,7 @@ class DetectionManager:
             return base_interval
         
         # Calculate average CPU usage
-        avg_cpu = sum(self.cpu_usage_history) / len(self.cpu_usage_history)
+        avg_cpu = self.cpu_usage_history.mean()
         
         # Adjust based on CPU load
         if avg_cpu > 80:
@@ -753,27 +1147,35 @@ class DetectionManager:
         """
         if camera_id:
             # Return status for a specific camera
-            if camera_id in self.states:
-                state = self.states[camera_id]
-                return {
-                    "camera_id": camera_id,
-                    "person_detected": state["person_detected"],
-                    "last_detection_time": state["last_detection_time"],
-                    "direction": self._direction_to_string(state["current_direction"])
-                }
-            else:
-                return {
-                    "camera_id": camera_id,
-                    "person_detected": False,
-                    "last_detection_time": None,
-                    "direction": "unknown"
-                }
-        else:
-            # Return status for all cameras
-            result = {}
-            for cam_id in self.states:
-                result[cam_id] = self.get_detection_status(cam_id)
-            return result
+            return self._status_for(self.states.get(camera_id), camera_id)
+        
+        # Return status for all cameras
+        return {cam_id: self._status_for(state, cam_id) for cam_id, state in self.states.items()}
+    
+    def _status_for(self, state, camera_id):
+        """
+        Build the detection status for a single camera
+        
+        Args:
+            state: Detection state of the camera, or None if it has none
+            camera_id: ID of the camera
+            
+        Returns:
+            dict: Detection status
+        """
+        if state is None:
+            return {
+                "camera_id": camera_id,
+                "person_detected": False,
+                "last_detection_time": None,
+                "direction": "unknown"
+            }
+        return {
+            "camera_id": camera_id,
+            "person_detected": state.person_detected,
+            "last_detection_time": state.last_detection_time,
+            "direction": self._DIRECTION_STRINGS.get(state.current_direction, "unknown")
+        }
     
     def is_person_detected(self, camera_id=None):
         """
@@ -788,14 +1190,11 @@ class DetectionManager:
         if camera_id:
             # Check specific camera
             if camera_id in self.states:
-                return self.states[camera_id]["person_detected"]
+                return self.states[camera_id].person_detected
             return False
         else:
             # Check any camera
-            for camera_id in self.states:
-                if self.states[camera_id]["person_detected"]:
-                    return True
-            return False
+            return bool(self._detected_cameras)
     
     def get_active_cameras(self):
         """
@@ -808,10 +1207,10 @@ class DetectionManager:
     
     def get_detection_count(self):
         """
-        Get the number of active detection threads
+        Get the number of cameras with active detection
         
         Returns:
-            int: Number of active detection threads
+            int: Number of cameras with active detection
         """
         return len(self.detection_threads)
     
@@ -823,10 +1222,10 @@ class DetectionManager:
             dict: System resource information
         """
         return {
-            "cpu_percent": list(self.cpu_usage_history),
-            "memory_percent": list(self.memory_usage_history),
-            "avg_cpu": sum(self.cpu_usage_history) / len(self.cpu_usage_history) if self.cpu_usage_history else 0,
-            "avg_memory": sum(self.memory_usage_history) / len(self.memory_usage_history) if self.memory_usage_history else 0
+            "cpu_percent": self.cpu_usage_history.tolist(),
+            "memory_percent": self.memory_usage_history.tolist(),
+            "avg_cpu": self.cpu_usage_history.mean(),
+            "avg_memory": self.memory_usage_history.mean()
         }
     
     def _load_roi_settings(self):
@@ -845,19 +1244,68 @@ class DetectionManager:
                 roi_data = self.db_manager.get_camera_roi(camera_id)
                 
                 if roi_data:
-                    x1, y1, x2, y2 = roi_data.get('coords', (None, None, None, None))
+                    coords = roi_data.get('coords') or {}
+                    if isinstance(coords, dict):
+                        coords = (coords.get('x1'), coords.get('y1'), coords.get('x2'), coords.get('y2'))
+                    x1, y1, x2, y2 = coords
                     entry_direction = roi_data.get('entry_direction')
                     
                     if all(coord is not None for coord in (x1, y1, x2, y2)) and entry_direction:
-                        self.roi_settings[camera_id] = {
-                            "coords": (x1, y1, x2, y2),
-                            "entry_direction": entry_direction
-                        }
-                        self.logger.info(f"Loaded ROI settings for camera {camera_id}: "
-                                       f"({x1}, {y1}, {x2}, {y2}), entry: {entry_direction}")
+                        # Mark invalid ROIs with coords=None so the detection loop can trust stored coords
+                        valid = self._is_valid_roi((x1, y1, x2, y2))
+                        self.roi_settings[_intern_camera_id(camera_id)] = RoiSetting(
+                            (x1, y1, x2, y2) if valid else None,
+                            entry_direction
+                        )
+                        if not valid:
+                            self.logger.warning("Ignoring invalid ROI for camera %s: (%s, %s, %s, %s)",
+                                                camera_id, x1, y1, x2, y2)
+                        elif self.logger.isEnabledFor(logging.INFO):
+                            self.logger.info("Loaded ROI settings for camera %s: (%s, %s, %s, %s), entry: %s",
+                                             camera_id, x1, y1, x2, y2, entry_direction)
             
         except Exception as e:
-            self.logger.error(f"Error loading ROI settings: {e}")
+            self.logger.error("Error loading ROI settings: %s", e)
+    
+    def _camera_exists(self, camera_id):
+        """
+        Check that a camera is registered, caching positive results briefly
+        
+        Args:
+            camera_id: ID of the camera
+            
+        Returns:
+            bool: True if the camera exists, False otherwise
+        """
+        now = time.monotonic()
+        expiry = self._camera_exists_cache.get(camera_id)
+        if expiry is not None and now < expiry:
+            return True
+        
+        if not self.camera_registry.get_camera(camera_id):
+            self._camera_exists_cache.pop(camera_id, None)
+            return False
+        
+        self._camera_exists_cache[camera_id] = now + self._camera_exists_ttl
+        return True
+    
+    def _is_valid_roi(self, roi_coords):
+        """
+        Check that ROI coordinates describe a non-empty rectangle
+        
+        Args:
+            roi_coords: Tuple of (x1, y1, x2, y2) coordinates
+            
+        Returns:
+            bool: True if the coordinates are valid, False otherwise
+        """
+        try:
+            if len(roi_coords) != 4:
+                return False
+            x1, y1, x2, y2 = (float(coord) for coord in roi_coords)
+        except (TypeError, ValueError):
+            return False
+        return x2 > x1 and y2 > y1
     
     def set_roi(self, camera_id, roi_coords):
         """
@@ -872,37 +1320,31 @@ class DetectionManager:
         """
         try:
             # Check if the camera exists
-            if not self.camera_registry.get_camera(camera_id):
-                self.logger.error(f"Cannot set ROI: Camera {camera_id} not found")
+            if not self._camera_exists(camera_id):
+                self.logger.error("Cannot set ROI: Camera %s not found", camera_id)
                 return False
                 
             # Validate ROI coordinates
-            if len(roi_coords) != 4:
-                self.logger.error(f"Invalid ROI coordinates: {roi_coords}")
+            if not self._is_valid_roi(roi_coords):
+                self.logger.error("Invalid ROI coordinates: %s", roi_coords)
                 return False
                 
             # Get existing entry direction if available
-            entry_direction = None
-            if camera_id in self.roi_settings:
-                entry_direction = self.roi_settings[camera_id].get("entry_direction", self.ENTRY_DIRECTION_LTR)
-            else:
-                entry_direction = self.ENTRY_DIRECTION_LTR
+            roi = self.roi_settings.get(camera_id)
+            entry_direction = roi.entry_direction if roi and roi.entry_direction else self.ENTRY_DIRECTION_LTR
                 
             # Update ROI settings
-            self.roi_settings[camera_id] = {
-                "coords": roi_coords,
-                "entry_direction": entry_direction
-            }
+            self.roi_settings[_intern_camera_id(camera_id)] = RoiSetting(roi_coords, entry_direction)
             
             # Save to database if available
             if self.db_manager:
                 self.db_manager.save_camera_roi(camera_id, roi_coords, entry_direction)
                 
-            self.logger.info(f"Set ROI for camera {camera_id}: {roi_coords}")
+            self.logger.info("Set ROI for camera %s: %s", camera_id, roi_coords)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error setting ROI for camera {camera_id}: {e}")
+            self.logger.error("Error setting ROI for camera %s: %s", camera_id, e)
             return False
     
     def set_entry_direction(self, camera_id, entry_direction):
@@ -918,35 +1360,31 @@ class DetectionManager:
         """
         try:
             # Check if the camera exists
-            if not self.camera_registry.get_camera(camera_id):
-                self.logger.error(f"Cannot set entry direction: Camera {camera_id} not found")
+            if not self._camera_exists(camera_id):
+                self.logger.error("Cannot set entry direction: Camera %s not found", camera_id)
                 return False
                 
             # Validate entry direction
-            if entry_direction not in (self.ENTRY_DIRECTION_LTR, self.ENTRY_DIRECTION_RTL):
-                self.logger.error(f"Invalid entry direction: {entry_direction}")
+            if entry_direction not in self._VALID_ENTRY_DIRECTIONS:
+                self.logger.error("Invalid entry direction: %s", entry_direction)
                 return False
                 
             # Get existing ROI if available
-            roi_coords = None
-            if camera_id in self.roi_settings:
-                roi_coords = self.roi_settings[camera_id].get("coords")
+            roi = self.roi_settings.get(camera_id)
+            roi_coords = roi.coords if roi else None
                 
             # Update entry direction
-            if camera_id not in self.roi_settings:
-                self.roi_settings[camera_id] = {}
-                
-            self.roi_settings[camera_id]["entry_direction"] = entry_direction
+            self.roi_settings[_intern_camera_id(camera_id)] = RoiSetting(roi_coords, entry_direction)
             
             # Save to database if available
             if self.db_manager and roi_coords:
                 self.db_manager.save_camera_roi(camera_id, roi_coords, entry_direction)
                 
-            self.logger.info(f"Set entry direction for camera {camera_id}: {entry_direction}")
+            self.logger.info("Set entry direction for camera %s: %s", camera_id, entry_direction)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error setting entry direction for camera {camera_id}: {e}")
+            self.logger.error("Error setting entry direction for camera %s: %s", camera_id, e)
             return False
     
     def get_roi(self, camera_id):
@@ -959,9 +1397,8 @@ class DetectionManager:
         Returns:
             tuple: ROI coordinates (x1, y1, x2, y2) or None
         """
-        if camera_id in self.roi_settings:
-            return self.roi_settings[camera_id].get("coords")
-        return None
+        roi = self.roi_settings.get(camera_id)
+        return roi.coords if roi else None
     
     def get_entry_direction(self, camera_id):
         """
@@ -973,9 +1410,8 @@ class DetectionManager:
         Returns:
             str: Entry direction or None
         """
-        if camera_id in self.roi_settings:
-            return self.roi_settings[camera_id].get("entry_direction")
-        return None
+        roi = self.roi_settings.get(camera_id)
+        return roi.entry_direction if roi else None
     
     def clear_roi(self, camera_id):
         """
@@ -989,8 +1425,8 @@ class DetectionManager:
         """
         try:
             # Check if the camera exists
-            if not self.camera_registry.get_camera(camera_id):
-                self.logger.error(f"Cannot clear ROI: Camera {camera_id} not found")
+            if not self._camera_exists(camera_id):
+                self.logger.error("Cannot clear ROI: Camera %s not found", camera_id)
                 return False
                 
             # Remove ROI settings
@@ -1001,9 +1437,9 @@ class DetectionManager:
             if self.db_manager:
                 self.db_manager.delete_camera_roi(camera_id)
                 
-            self.logger.info(f"Cleared ROI for camera {camera_id}")
+            self.logger.info("Cleared ROI for camera %s", camera_id)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error clearing ROI for camera {camera_id}: {e}")
+            self.logger.error("Error clearing ROI for camera %s: %s", camera_id, e)
             return False 
\ No newline at end of file
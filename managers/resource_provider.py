@@ -6,13 +6,15 @@ import yaml
 import logging
 from logging.handlers import RotatingFileHandler
 import copy
-from datetime import datetime
 
 class ResourceProvider:
     """
     Provides centralized access to configuration and logging resources
     """
     
+    # Parsed configuration files keyed by (path, modification time)
+    _config_cache = {}
+    
     def __init__(self, config_path='config.yaml'):
         """
         Initialize the resource provider
@@ -39,13 +41,22 @@ class ResourceProvider:
             dict: Configuration dictionary
         """
         try:
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f)
-                return config or {}
-            else:
+            try:
+                mtime = os.stat(config_path).st_mtime_ns
+            except FileNotFoundError:
                 print(f"Warning: Config file not found at {config_path}, using defaults")
                 return {}
+            
+            # Reuse the parsed file if it has not changed since it was last loaded
+            cache_key = (os.path.abspath(config_path), mtime)
+            cached = self._config_cache.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+            
+            with open(config_path, 'r') as f:
+                config = yaml.safe_load(f) or {}
+            self._config_cache[cache_key] = copy.deepcopy(config)
+            return config
         except Exception as e:
             print(f"Error loading config: {e}")
             return {}
@@ -57,9 +68,9 @@ class ResourceProvider:
         Returns:
             logging.Logger: Configured logger
         """
-        log_config = self.config.get('logging', {})
+        log_config = self.config.get('logging') or {}
         log_level_str = log_config.get('level', 'INFO')
-        log_level = getattr(logging, log_level_str.upper(), logging.INFO)
+        log_level = logging._nameToLevel.get(str(log_level_str).upper(), logging.INFO)
         
         # Create logger
         logger = logging.getLogger('zvision')
@@ -86,7 +97,7 @@ class ResourceProvider:
         max_size_mb = log_config.get('max_size_mb', 10)
         backup_count = log_config.get('backup_count', 5)
         
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = RotatingFileHandler(
             log_file, 
             maxBytes=max_size_mb * 1024 * 1024,
             backupCount=backup_count
@@ -109,13 +120,18 @@ class ResourceProvider:
         """
         return self.config
     
-    def get_logger(self):
+    def get_logger(self, name=None):
         """
         Get the logger
         
+        Args:
+            name: Optional name of a child logger; child loggers share the handlers
+            
         Returns:
             logging.Logger: Logger
         """
+        if name:
+            return self.logger.getChild(name)
         return self.logger
     
     def clone_with_custom_config(self, custom_config_updates):
@@ -131,8 +147,9 @@ class ResourceProvider:
         # Create a new instance
         new_provider = ResourceProvider.__new__(ResourceProvider)
         
-        # Deep copy the config
-        new_provider.config = copy.deepcopy(self.config)
+        # Shallow copy the config; nested sections are only copied along the update paths,
+        # so untouched sections are shared with this provider and must be treated as read-only
+        new_provider.config = dict(self.config)
         
         # Apply the custom updates by recursive update
         self._recursive_update(new_provider.config, custom_config_updates)
@@ -144,7 +161,8 @@ class ResourceProvider:
     
     def _recursive_update(self, base_dict, update_dict):
         """
-        Recursively update a dictionary with another
+        Recursively update a dictionary with another, copying nested
+        dictionaries before descending into them so shared subtrees are never modified
         
         Args:
             base_dict: Base dictionary to update
@@ -152,6 +170,7 @@ class ResourceProvider:
         """
         for key, value in update_dict.items():
             if isinstance(value, dict) and key in base_dict and isinstance(base_dict[key], dict):
+                base_dict[key] = dict(base_dict[key])
                 self._recursive_update(base_dict[key], value)
             else:
                 base_dict[key] = value 
\ No newline at end of file
@@ -2,11 +2,81 @@
 # Storage Manager - Handles automatic cleanup of snapshot files
 
 import os
+import sys
 import time
+import errno
+import ctypes
 import threading
+import concurrent.futures
+from collections import deque
+import functools
+import heapq
+import operator
 from pathlib import Path
 import logging
 
+# statx(2) lets us request only the modification time and accept cached attributes,
+# which is cheaper than a full stat on network and FUSE filesystems
+_AT_FDCWD = -100
+_AT_SYMLINK_NOFOLLOW = 0x100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_MTIME = 0x40
+_STATX_MTIME_OFFSET = 112  # Offset of stx_mtime within struct statx
+
+_statx = None
+if sys.platform.startswith("linux"):
+    try:
+        _statx = ctypes.CDLL(None, use_errno=True).statx
+        _statx.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.c_void_p]
+        _statx.restype = ctypes.c_int
+    except (AttributeError, OSError):
+        _statx = None
+_HAS_STATX = _statx is not None
+
+# Resolve snapshot names relative to an open directory fd (statx/unlinkat) where supported
+_SUPPORTS_DIR_FD = (
+    hasattr(os, "O_DIRECTORY")
+    and os.stat in os.supports_dir_fd
+    and os.unlink in os.supports_dir_fd
+)
+
+# Large deletion batches are spread over a small pool of unlink workers
+_PARALLEL_DELETE_THRESHOLD = 64
+
+def _fast_mtime(path, dir_fd=None):
+    """
+    Get the modification time of a file, using statx on Linux when available
+    
+    Args:
+        path: Path of the file (relative to dir_fd if given)
+        dir_fd: Optional file descriptor of the directory containing the file
+        
+    Returns:
+        float: Modification time in seconds since the epoch
+    """
+    global _HAS_STATX
+    
+    if _HAS_STATX:
+        buf = ctypes.create_string_buffer(256)  # sizeof(struct statx)
+        flags = _AT_SYMLINK_NOFOLLOW | _AT_STATX_DONT_SYNC
+        base_fd = _AT_FDCWD if dir_fd is None else dir_fd
+        if _statx(base_fd, os.fsencode(path), flags, _STATX_MTIME, buf) == 0:
+            # Some filesystems do not report mtime; stx_mask says whether it was filled in
+            if not ctypes.c_uint32.from_buffer(buf, 0).value & _STATX_MTIME:
+                return os.stat(path, dir_fd=dir_fd, follow_symlinks=False).st_mtime
+            tv_sec = ctypes.c_int64.from_buffer(buf, _STATX_MTIME_OFFSET).value
+            tv_nsec = ctypes.c_uint32.from_buffer(buf, _STATX_MTIME_OFFSET + 8).value
+            return tv_sec + tv_nsec / 1e9
+        
+        err = ctypes.get_errno()
+        if err not in (errno.ENOSYS, errno.EPERM):
+            raise OSError(err, os.strerror(err), path)
+        
+        # Kernel (or seccomp policy) does not support statx, use stat from now on
+        _HAS_STATX = False
+    
+    return os.stat(path, dir_fd=dir_fd, follow_symlinks=False).st_mtime
+
 class SnapshotStorageManager:
     """
     Manages storage of snapshot files using a FIFO approach
@@ -23,6 +93,7 @@ class SnapshotStorageManager:
             logger: Optional logger instance
         """
         self.directory = Path(directory)
+        self._root = os.path.normpath(directory)  # Plain string path used on the cleanup path
         self.max_files = max_files
         
         # Create directory if it doesn't exist
@@ -32,30 +103,122 @@ class SnapshotStorageManager:
         # Set up logging
         self.logger = logger or logging.getLogger(__name__)
         
+        # Per-directory (mtime, name) index, oldest first, for directories whose writer
+        # registers new snapshots; these are trimmed without rescanning the directory.
+        # The bounded deques are shared without a lock: single append/popleft calls are atomic
+        self._index = {}
+        self._registered_dirs = set()
+        
+        # Camera subdirectory listing reused between runs for camera_dirs_ttl seconds
+        # (0 disables caching); register() invalidates it when a new camera appears
+        self.camera_dirs_ttl = 0
+        self._camera_dirs_cache = None
+        self._camera_dirs_ts = 0.0
+        
+        # Capture-driven cleanup: every capture_cleanup_every captures of a camera, its directory
+        # is cleaned in the background so deletions are spread out instead of done in hourly bursts
+        self.capture_cleanup_every = max(1, max_files // 20)
+        self._capture_counts = {}
+        self._capture_cleanups_pending = set()
+        self._capture_cleanup_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="snapshot-fifo-capture"
+        )
+        
+        # Pool for deleting large batches of snapshots in parallel
+        self._delete_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=4,
+            thread_name_prefix="snapshot-unlink"
+        )
+        
+        # Per-directory locks so capture-driven and periodic cleanup of the same
+        # directory never rebuild its index at the same time
+        self._dir_locks = {}
+        
         self.logger.info(f"SnapshotStorageManager initialized with max files: {max_files}")
     
+    def register(self, camera_id, filename, mtime=None):
+        """
+        Record a newly written snapshot so cleanup can use the in-memory index
+        
+        Args:
+            camera_id: ID of the camera the snapshot belongs to
+            filename: Path of the snapshot file
+            mtime: Optional modification time of the file (defaults to now)
+        """
+        key = os.path.join(self._root, camera_id)
+        entry = (time.time() if mtime is None else mtime, os.path.basename(filename))
+        if key not in self._registered_dirs:
+            self._registered_dirs.add(key)
+            self._camera_dirs_cache = None
+        
+        index = self._index.get(key)
+        if index is not None:
+            index.append(entry)
+    
+    def notify_capture(self, camera_id):
+        """
+        Count a captured snapshot and periodically schedule cleanup of the camera's directory
+        
+        Args:
+            camera_id: ID of the camera that captured the snapshot
+        """
+        count = self._capture_counts.get(camera_id, 0) + 1
+        if count < self.capture_cleanup_every:
+            self._capture_counts[camera_id] = count
+            return
+        self._capture_counts[camera_id] = 0
+        
+        # Skip if a cleanup for this camera is still queued or running
+        if camera_id in self._capture_cleanups_pending:
+            return
+        self._capture_cleanups_pending.add(camera_id)
+        
+        directory = os.path.join(self._root, camera_id)
+        try:
+            future = self._capture_cleanup_executor.submit(self._enforce_fifo_for_dir, directory)
+        except RuntimeError:
+            # Executor already shut down
+            self._capture_cleanups_pending.discard(camera_id)
+            return
+        future.add_done_callback(lambda _: self._capture_cleanups_pending.discard(camera_id))
+    
     def enforce_fifo(self):
         """
         Delete the oldest files if the maximum number is exceeded
         Handles each camera subfolder separately
         """
         try:
-            # Check if directory exists
-            if not self.directory.exists():
-                self.logger.warning(f"Snapshot directory {self.directory} does not exist")
-                return
-            
-            # Process each camera subdirectory separately
-            camera_dirs = [d for d in self.directory.iterdir() if d.is_dir()]
+            # Process each camera subdirectory separately, reusing a recent listing if possible
+            camera_dirs = self._camera_dirs_cache
+            now = time.monotonic()
+            if camera_dirs is None or now - self._camera_dirs_ts >= self.camera_dirs_ttl:
+                # Check if directory exists
+                if not os.path.isdir(self._root):
+                    self.logger.warning(f"Snapshot directory {self._root} does not exist")
+                    return
+                
+                # DirEntry paths are already strings and is_dir() uses the cached d_type
+                with os.scandir(self._root) as entries:
+                    camera_dirs = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+                self._camera_dirs_cache = camera_dirs
+                self._camera_dirs_ts = now
             
             # If no camera directories exist yet, check the main directory
             if not camera_dirs:
-                self._enforce_fifo_for_dir(self.directory)
+                self._enforce_fifo_for_dir(self._root)
                 return
                 
-            # Apply FIFO to each camera directory
-            for camera_dir in camera_dirs:
-                self._enforce_fifo_for_dir(camera_dir)
+            # Apply FIFO to each camera directory; the work is I/O bound, so overlap the directories
+            if len(camera_dirs) == 1:
+                self._enforce_fifo_for_dir(camera_dirs[0])
+                return
+            
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(8, len(camera_dirs)),
+                thread_name_prefix="snapshot-fifo"
+            ) as executor:
+                list(executor.map(self._enforce_fifo_for_dir, camera_dirs))
                 
         except Exception as e:
             self.logger.error(f"Error in enforce_fifo: {e}")
@@ -67,36 +230,121 @@ class SnapshotStorageManager:
         Args:
             directory: Directory to clean up
         """
+        key = os.path.normpath(directory)
+        dir_fd = None
+        lock = self._dir_locks.setdefault(key, threading.Lock())
+        lock.acquire()
         try:
-            # Get all jpg files in the directory
-            files = list(directory.glob("*.jpg"))
+            index = self._index.get(key)
+            if index is not None and len(index) >= index.maxlen:
+                # The bounded index may have dropped entries; rebuild it from a scan
+                index = None
             
-            # Check if we need to delete any files
-            if len(files) <= self.max_files:
+            if index is not None:
+                # Steady state: trim the oldest indexed entries without scanning the directory
+                files_to_delete = []
+                while len(index) > self.max_files:
+                    try:
+                        files_to_delete.append(index.popleft()[1])
+                    except IndexError:
+                        break
+                remaining = len(index)
+            else:
+                indexed = key in self._registered_dirs
+                if indexed:
+                    # Collect registrations that arrive while the directory is scanned
+                    pending = deque(maxlen=self.max_files * 2)
+                    self._index[key] = pending
+            
+            # Cheap entry count (no per-file stat) before a full scan of an unindexed directory:
+            # if the directory holds no more entries than allowed, there is nothing to delete
+            if index is None and not indexed and len(os.listdir(directory)) <= self.max_files:
                 return
             
-            # Sort files by modification time (oldest first)
-            files.sort(key=lambda x: os.path.getmtime(str(x)))
+            # Open the directory once so stat/unlink resolve names relative to it
+            if _SUPPORTS_DIR_FD and (index is None or files_to_delete):
+                dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
             
-            # Calculate how many files to delete
-            num_to_delete = len(files) - self.max_files
-            files_to_delete = files[:num_to_delete]
+            if index is None:
+                # Collect (mtime, name) for all jpg files in a single directory pass
+                files = []
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".jpg") and entry.is_file(follow_symlinks=False):
+                            target = entry.name if dir_fd is not None else entry.path
+                            files.append((_fast_mtime(target, dir_fd), entry.name))
+                
+                num_to_delete = max(len(files) - self.max_files, 0)
+                if indexed:
+                    # Build the index from the scan (full sort, once) in front of the
+                    # registrations that arrived while scanning
+                    files.sort(key=operator.itemgetter(0))
+                    queued = {name for _, name in list(pending)}
+                    pending.extendleft(reversed([e for e in files[num_to_delete:] if e[1] not in queued]))
+                    files_to_delete = [name for _, name in files[:num_to_delete]]
+                else:
+                    # Select only the oldest files by modification time (partial sort)
+                    oldest = heapq.nsmallest(num_to_delete, files, key=operator.itemgetter(0))
+                    files_to_delete = [name for _, name in oldest]
+                remaining = len(files) - num_to_delete
+            
+            # Check if we need to delete any files
+            if not files_to_delete:
+                return
             
-            # Delete the oldest files
-            for file in files_to_delete:
-                try:
-                    os.remove(str(file))
-                    self.logger.info(f"Deleted snapshot: {file}")
-                except Exception as e:
-                    self.logger.error(f"Failed to delete {file}: {e}")
+            # Delete the oldest files (waiting for all deletions before the fd is closed)
+            delete = functools.partial(self._delete_snapshot, directory, dir_fd)
+            if len(files_to_delete) > _PARALLEL_DELETE_THRESHOLD:
+                list(self._delete_executor.map(delete, files_to_delete))
+            else:
+                for name in files_to_delete:
+                    delete(name)
             
-            remaining = len(files) - len(files_to_delete)
             self.logger.info(f"FIFO cleanup completed for {directory}: deleted {len(files_to_delete)} files, remaining: {remaining}")
             
         except Exception as e:
             self.logger.error(f"Error in _enforce_fifo_for_dir({directory}): {e}")
+            # Rebuild the index from a fresh scan next time
+            self._index.pop(key, None)
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+            lock.release()
+    
+    def shutdown(self, wait=True):
+        """
+        Stop the background executors used for capture-driven cleanup and deletion
+        
+        Args:
+            wait: Whether to wait for a running cleanup to finish
+        """
+        self._capture_cleanup_executor.shutdown(wait=wait, cancel_futures=True)
+        self._delete_executor.shutdown(wait=wait)
 
-def start_snapshot_cleanup_thread(directory="snapshots", max_files=1000, interval=3600, logger=None):
+    def _delete_snapshot(self, directory, dir_fd, name):
+        """
+        Delete a single snapshot file
+        
+        Args:
+            directory: Directory containing the file
+            dir_fd: Open file descriptor of the directory, or None to use the full path
+            name: File name of the snapshot
+        """
+        file = os.path.join(directory, name)
+        try:
+            if dir_fd is not None:
+                os.unlink(name, dir_fd=dir_fd)
+            else:
+                os.remove(file)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Deleted snapshot: %s", file)
+        except FileNotFoundError:
+            self.logger.debug("Snapshot already removed: %s", file)
+        except Exception as e:
+            self.logger.error("Failed to delete %s: %s", file, e)
+
+def start_snapshot_cleanup_thread(directory="snapshots", max_files=1000, interval=3600, logger=None,
+                                  storage_manager=None):
     """
     Start a daemon thread for periodic snapshot cleanup
     
@@ -105,28 +353,42 @@ def start_snapshot_cleanup_thread(directory="snapshots", max_files=1000, interva
         max_files: Maximum number of files to keep
         interval: Cleanup interval in seconds
         logger: Optional logger instance
+        storage_manager: Optional SnapshotStorageManager to use (created from the other arguments if not given)
     
     Returns:
-        threading.Thread: The started daemon thread
+        tuple: (threading.Thread, threading.Event) - the started daemon thread and the
+        event that stops it when set
     """
     logger = logger or logging.getLogger(__name__)
+    stop_event = threading.Event()
     
     def periodic_snapshot_cleanup():
-        storage_manager = SnapshotStorageManager(directory, max_files, logger)
+        manager = storage_manager or SnapshotStorageManager(directory, max_files, logger)
+        if not manager.camera_dirs_ttl:
+            # Camera directories rarely change; a TTL longer than the interval (but
+            # shorter than two) reuses each listing for one more run, so the
+            # top-level directory is scanned only on every other run
+            manager.camera_dirs_ttl = interval * 1.5
         logger.info(f"Starting periodic snapshot cleanup (interval: {interval}s, max files: {max_files})")
         
-        while True:
+        while not stop_event.is_set():
             try:
                 # Run FIFO cleanup
-                storage_manager.enforce_fifo()
+                manager.enforce_fifo()
                 
-                # Sleep until next cleanup
-                time.sleep(interval)
+                # Wait until next cleanup (returns early when stopped)
+                if stop_event.wait(interval):
+                    break
                 
             except Exception as e:
                 logger.error(f"Error in periodic cleanup thread: {e}")
-                # Sleep a bit to avoid tight loop in case of recurring errors
-                time.sleep(60)
+                # Wait a bit to avoid tight loop in case of recurring errors
+                stop_event.wait(60)
+        
+        if storage_manager is None:
+            # Release the executors of the manager created for this thread
+            manager.shutdown()
+        logger.info("Periodic snapshot cleanup stopped")
     
     # Create and start the daemon thread
     thread = threading.Thread(target=periodic_snapshot_cleanup, daemon=True)
@@ -134,7 +396,7 @@ def start_snapshot_cleanup_thread(directory="snapshots", max_files=1000, interva
     thread.start()
     
     logger.info("Snapshot cleanup thread started")
-    return thread
+    return thread, stop_event
 
 if __name__ == "__main__":
     # Simple test code for when run directly
@@ -142,11 +404,13 @@ if __name__ == "__main__":
     logger = logging.getLogger("SnapshotTest")
     
     # Start cleanup with a short interval for testing
-    start_snapshot_cleanup_thread(max_files=100, interval=10, logger=logger)
+    thread, stop_event = start_snapshot_cleanup_thread(max_files=100, interval=10, logger=logger)
     
     logger.info("Test mode: Cleanup thread started, press Ctrl+C to exit")
     try:
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
+        stop_event.set()
+        thread.join()
         logger.info("Test mode: Exiting") 
\ No newline at end of file
@@ -10,6 +10,9 @@ logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('simple-server')
 
+# Absolute static directory, resolved once (Flask resolves relative paths against the app root)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
 # Create Flask app
 app = Flask(__name__, static_folder="static", static_url_path="/static")
 
@@ -17,7 +20,7 @@ app = Flask(__name__, static_folder="static", static_url_path="/static")
 @app.route('/')
 def index():
     """Serve the test page"""
-    return send_from_directory('static', 'simple_test.html')
+    return send_from_directory(STATIC_DIR, 'simple_test.html', conditional=True, max_age=3600)
 
 @app.route('/api/test')
 def test_api():
@@ -27,10 +30,18 @@ def test_api():
         "message": "Simple API server is running"
     })
 
-# Create static directory if it doesn't exist
-os.makedirs('static', exist_ok=True)
-
 if __name__ == '__main__':
+    # Create static directory if it doesn't exist
+    if not os.path.isdir(STATIC_DIR):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+    
     logger.info("Starting simple Flask server on port 5000")
     print("Server running at: http://localhost:5000")
-    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True) 
\ No newline at end of file
+    if os.environ.get('ZVISION_DEV'):
+        # Development mode: Werkzeug server with reloader and debugger
+        app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
+    else:
+        # Serve with eventlet's WSGI server (already a dependency for Flask-SocketIO)
+        import eventlet
+        from eventlet import wsgi
+        wsgi.server(eventlet.listen(('0.0.0.0', 5000)), app, log_output=False) 
\ No newline at end of file
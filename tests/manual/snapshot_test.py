@@ -22,10 +22,13 @@ logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("SnapshotTest")
 
-def create_test_snapshot(directory, camera_id, index):
-    """Create a test snapshot with visible index number"""
-    # Create a blank frame
-    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+def create_test_snapshot(directory, camera_id, index, frame=None):
+    """Create a test snapshot with visible index number (reusing frame as the buffer if given)"""
+    # Create a blank frame, or clear the reused one (imwrite copies the pixels out)
+    if frame is None:
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    else:
+        frame.fill(0)
     
     # Add timestamp and index
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -41,8 +44,15 @@ def create_test_snapshot(directory, camera_id, index):
     timestamp_file = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     filename = f"{directory}/camera_{camera_id}_{timestamp_file}.jpg"
     
-    # Save the image
-    cv2.imwrite(filename, frame)
+    # Encode in memory and write the bytes with a single open/write/close
+    ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    if not ok:
+        raise RuntimeError(f"Failed to encode test snapshot {filename}")
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, encoded.tobytes())
+    finally:
+        os.close(fd)
     logger.info(f"Created test snapshot: {filename}")
     
     return filename
@@ -62,9 +72,10 @@ def test_snapshot_capture():
     snapshots = []
     
     logger.info(f"Capturing test snapshots in {snapshot_dir}")
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
     for camera_id in camera_ids:
         for i in range(5):
-            snapshot_path = create_test_snapshot(snapshot_dir, camera_id, i)
+            snapshot_path = create_test_snapshot(snapshot_dir, camera_id, i, frame)
             snapshots.append(snapshot_path)
             time.sleep(0.1)  # Small delay to ensure different timestamps
     
@@ -189,8 +200,9 @@ def main():
         
         # Create more snapshots to test cleanup again
         logger.info("Creating additional snapshots to test cleanup again")
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
         for i in range(5):
-            create_test_snapshot(snapshot_dir, "main", i + 100)
+            create_test_snapshot(snapshot_dir, "main", i + 100, frame)
         
         # Run cleanup again
         logger.info("Running cleanup again")
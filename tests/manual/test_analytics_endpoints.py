@@ -6,6 +6,10 @@ import json
 import time
 import sys
 import argparse
+import numpy as np
+
+# Seconds to wait for each endpoint before giving up
+REQUEST_TIMEOUT = 5
 
 def test_analytics_endpoints(host="localhost", port=5000):
     """
@@ -13,12 +17,15 @@ def test_analytics_endpoints(host="localhost", port=5000):
     """
     base_url = f"http://{host}:{port}"
     
+    # Reuse one keep-alive connection for all requests
+    session = requests.Session()
+    
     print("\n===== Testing Analytics Endpoints =====\n")
     
     # Test compare endpoint
     print("\n----- Testing /api/analytics/compare endpoint -----")
     try:
-        response = requests.get(f"{base_url}/api/analytics/compare")
+        response = session.get(f"{base_url}/api/analytics/compare", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             print("SUCCESS: Compare endpoint returned 200 OK")
@@ -36,7 +43,7 @@ def test_analytics_endpoints(host="localhost", port=5000):
     # Test time-series endpoint (all cameras)
     print("\n----- Testing /api/analytics/time-series endpoint (all cameras) -----")
     try:
-        response = requests.get(f"{base_url}/api/analytics/time-series")
+        response = session.get(f"{base_url}/api/analytics/time-series", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             print("SUCCESS: Time-series endpoint returned 200 OK")
@@ -63,7 +70,7 @@ def test_analytics_endpoints(host="localhost", port=5000):
     print("\n----- Testing /api/analytics/time-series endpoint (specific camera) -----")
     camera_id = "main"  # Change to a camera ID that exists in your system
     try:
-        response = requests.get(f"{base_url}/api/analytics/time-series?camera={camera_id}")
+        response = session.get(f"{base_url}/api/analytics/time-series?camera={camera_id}", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             print(f"SUCCESS: Time-series endpoint for camera '{camera_id}' returned 200 OK")
@@ -85,7 +92,7 @@ def test_analytics_endpoints(host="localhost", port=5000):
     print("\n----- Testing /api/analytics/heatmap endpoint -----")
     camera_id = "main"  # Change to a camera ID that exists in your system
     try:
-        response = requests.get(f"{base_url}/api/analytics/heatmap?camera={camera_id}")
+        response = session.get(f"{base_url}/api/analytics/heatmap?camera={camera_id}", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             print(f"SUCCESS: Heatmap endpoint for camera '{camera_id}' returned 200 OK")
@@ -98,22 +105,24 @@ def test_analytics_endpoints(host="localhost", port=5000):
                 for i, row in enumerate(heatmap[:3]):
                     print(f"  Row {i+1}: {row[:10]}")
                 
-                # Find and print hot spots (areas with non-zero values)
-                hot_spots = []
-                for y, row in enumerate(heatmap):
-                    for x, value in enumerate(row):
-                        if value > 0:
-                            hot_spots.append((x, y, value))
+                # Find and print the top 5 hot spots (areas with non-zero values)
+                grid = np.asarray(heatmap)
+                ys, xs = np.nonzero(grid > 0)
+                values = grid[ys, xs]
+                top = np.argpartition(-values, min(5, values.size) - 1)[:5] if values.size else values[:0]
+                top = top[np.argsort(-values[top], kind="stable")]
                 
                 print("\nHot spots (non-zero values):")
-                for x, y, value in sorted(hot_spots, key=lambda x: x[2], reverse=True)[:5]:
-                    print(f"  Position ({x}, {y}): Value {value}")
+                for i in top:
+                    print(f"  Position ({xs[i]}, {ys[i]}): Value {values[i].item()}")
         else:
             print(f"ERROR: Heatmap endpoint for camera '{camera_id}' returned {response.status_code}")
             print(response.text)
     except Exception as e:
         print(f"ERROR: Exception when testing heatmap endpoint: {e}")
     
+    session.close()
+    
     print("\n===== Analytics Endpoints Testing Complete =====\n")
 
 if __name__ == "__main__":
@@ -5,19 +5,53 @@
 import sys
 import os
 import time
+import re
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import unittest
+import concurrent.futures
 from urllib.parse import urljoin
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+# HTML elements the dashboard must contain, matched in a single scan of the page
+EXPECTED_ELEMENTS = [
+    'id="roi-canvas"',
+    'id="roi-controls"',
+    'id="save-roi"',
+    'id="reset-roi"',
+    'name="entryDir" value="LTR"',
+    'name="entryDir" value="RTL"'
+]
+EXPECTED_ELEMENTS_PATTERN = re.compile('|'.join(re.escape(element) for element in EXPECTED_ELEMENTS))
+
+# ROI coordinate fields compared as a whole against the configured test ROI
+ROI_COORD_KEYS = ("x1", "y1", "x2", "y2")
+
 class TestROIHTMLInterface(unittest.TestCase):
     """
     Manual test cases for the ROI HTML Interface.
     """
     
+    # Seconds to wait for each request before giving up
+    REQUEST_TIMEOUT = 10
+    
+    @classmethod
+    def setUpClass(cls):
+        """Open one keep-alive HTTP session shared by all tests"""
+        cls.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4,
+                              max_retries=Retry(total=2, backoff_factor=0.1))
+        cls.session.mount("http://", adapter)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Close the shared HTTP session"""
+        cls.session.close()
+    
     def setUp(self):
         """Set up the test environment"""
         self.base_url = "http://localhost:5000"
@@ -33,21 +67,13 @@ class TestROIHTMLInterface(unittest.TestCase):
         """Verify that the ROI interface HTML elements are loaded"""
         print("\n1. Verifying ROI HTML Interface Elements...")
         try:
-            response = requests.get(self.base_url)
+            response = self.session.get(self.base_url, timeout=self.REQUEST_TIMEOUT)
             self.assertEqual(response.status_code, 200, "Failed to load dashboard page")
             
             # Check for expected HTML elements
-            expected_elements = [
-                'id="roi-canvas"',
-                'id="roi-controls"',
-                'id="save-roi"',
-                'id="reset-roi"',
-                'name="entryDir" value="LTR"',
-                'name="entryDir" value="RTL"'
-            ]
-            
-            for element in expected_elements:
-                self.assertIn(element, response.text, f"Missing HTML element: {element}")
+            found = set(EXPECTED_ELEMENTS_PATTERN.findall(response.text))
+            missing = [element for element in EXPECTED_ELEMENTS if element not in found]
+            self.assertFalse(missing, f"Missing HTML elements: {missing}")
             
             print("✓ ROI HTML Interface elements verified")
             return True
@@ -60,10 +86,11 @@ class TestROIHTMLInterface(unittest.TestCase):
         print("\n2. Testing ROI API Endpoint (POST)...")
         try:
             endpoint = urljoin(self.base_url, "/api/cameras/0/roi")
-            response = requests.post(
+            response = self.session.post(
                 endpoint,
                 json=self.test_roi,
-                headers={"Content-Type": "application/json"}
+                headers={"Content-Type": "application/json"},
+                timeout=self.REQUEST_TIMEOUT
             )
             
             self.assertEqual(response.status_code, 200, "Failed to set ROI")
@@ -81,7 +108,7 @@ class TestROIHTMLInterface(unittest.TestCase):
         print("\n3. Verifying ROI in status endpoint...")
         try:
             endpoint = urljoin(self.base_url, "/api/status")
-            response = requests.get(endpoint)
+            response = self.session.get(endpoint, timeout=self.REQUEST_TIMEOUT)
             
             self.assertEqual(response.status_code, 200, "Failed to get status")
             data = response.json()
@@ -93,10 +120,9 @@ class TestROIHTMLInterface(unittest.TestCase):
             
             # Verify ROI values match what we set
             coords = data["roi"]["coords"]
-            self.assertEqual(coords["x1"], self.test_roi["x1"], "ROI x1 mismatch")
-            self.assertEqual(coords["y1"], self.test_roi["y1"], "ROI y1 mismatch")
-            self.assertEqual(coords["x2"], self.test_roi["x2"], "ROI x2 mismatch")
-            self.assertEqual(coords["y2"], self.test_roi["y2"], "ROI y2 mismatch")
+            self.assertEqual({k: coords[k] for k in ROI_COORD_KEYS},
+                             {k: self.test_roi[k] for k in ROI_COORD_KEYS},
+                             "ROI coordinates mismatch")
             self.assertEqual(data["roi"]["entry_direction"], self.test_roi["entry_direction"], "Entry direction mismatch")
             
             print("✓ ROI correctly included in status response")
@@ -110,7 +136,7 @@ class TestROIHTMLInterface(unittest.TestCase):
         print("\n4. Testing Clear ROI API Endpoint...")
         try:
             endpoint = urljoin(self.base_url, "/api/cameras/0/roi/clear")
-            response = requests.post(endpoint)
+            response = self.session.post(endpoint, timeout=self.REQUEST_TIMEOUT)
             
             self.assertEqual(response.status_code, 200, "Failed to clear ROI")
             data = response.json()
@@ -118,7 +144,7 @@ class TestROIHTMLInterface(unittest.TestCase):
             
             # Verify ROI is cleared in status
             status_endpoint = urljoin(self.base_url, "/api/status")
-            status_response = requests.get(status_endpoint)
+            status_response = self.session.get(status_endpoint, timeout=self.REQUEST_TIMEOUT)
             status_data = status_response.json()
             
             # ROI should be empty or have null coords
@@ -154,20 +180,26 @@ def main():
     test = TestROIHTMLInterface()
     
     # Setup test environment
+    TestROIHTMLInterface.setUpClass()
     test.setUp()
     
-    # Run API tests
-    tests = [
-        test.test_01_verify_interface_loaded,
+    # Run API tests: the page check is independent of the ROI set -> verify -> clear
+    # sequence, so run it alongside that sequence (both reuse the shared session)
+    roi_sequence = [
         test.test_02_set_roi_via_api,
         test.test_03_verify_roi_in_status,
-        test.test_04_clear_roi_via_api,
-        test.test_05_instructions
+        test.test_04_clear_roi_via_api
     ]
+    tests = [test.test_01_verify_interface_loaded] + roi_sequence + [test.test_05_instructions]
     
-    results = []
-    for test_func in tests:
-        results.append(test_func())
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            interface_future = executor.submit(test.test_01_verify_interface_loaded)
+            roi_future = executor.submit(lambda: [test_func() for test_func in roi_sequence])
+            results = [interface_future.result()] + roi_future.result()
+        results.append(test.test_05_instructions())
+    finally:
+        TestROIHTMLInterface.tearDownClass()
     
     # Print summary
     print("\nTest Summary:")
@@ -6,8 +6,11 @@ import os
 import time
 import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import sqlite3
+from functools import lru_cache
 
 # Add the parent directory to the path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -15,19 +18,39 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from managers.resource_provider import ResourceProvider
 from managers.database_manager import DatabaseManager
 
+@lru_cache(maxsize=1)
+def get_resource_provider():
+    """Get the resource provider, loading config.yaml only once"""
+    return ResourceProvider("config.yaml")
+
 def get_db_path():
     """Get the database path from config"""
-    resource_provider = ResourceProvider("config.yaml")
-    config = resource_provider.get_config()
+    config = get_resource_provider().get_config()
     return config.get('database', {}).get('path', 'database/zvision.db')
 
+# Keep-alive HTTP session reused by every API call in this script
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4,
+                                     max_retries=Retry(total=2, backoff_factor=0.1)))
+
+# Shared read-only connection reused by every database check in this script
+_DB_CONN = None
+
+# Row lookup used before and after clearing the ROI
+_CAMERA_CONFIG_ROW_QUERY = "SELECT * FROM camera_config WHERE camera_id = ?"
+
+def db():
+    """Get the shared database connection, opening it on first use"""
+    global _DB_CONN
+    if _DB_CONN is None:
+        _DB_CONN = sqlite3.connect(get_db_path(), check_same_thread=False)
+        _DB_CONN.execute("PRAGMA query_only=1")
+    return _DB_CONN
+
 def check_camera_config_table():
     """Check if the camera_config table exists in the database"""
-    db_path = get_db_path()
-    
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        cursor = db().cursor()
         
         # Check if the table exists
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='camera_config';")
@@ -51,29 +74,37 @@ def check_camera_config_table():
         else:
             print("❌ camera_config table does not exist in the database")
         
-        conn.close()
         return result is not None
         
     except Exception as e:
         print(f"Error checking camera_config table: {e}")
         return False
 
+def post_roi_batch(base_url, ops):
+    """Send a list of ROI operations for camera 0 in a single request"""
+    response = SESSION.post(f"{base_url}/api/cameras/0/roi/batch", json=ops)
+    if response.status_code != 200:
+        print(f"❌ ROI batch request failed: {response.status_code} - {response.text}")
+        return None
+    return response.json().get('results', [])
+
+def get_status_roi(base_url):
+    """Return the ROI section of the status endpoint, or None on error"""
+    response = SESSION.get(f"{base_url}/api/status")
+    if response.status_code != 200:
+        print(f"❌ Error accessing status endpoint: {response.status_code}")
+        return None
+    status_data = response.json()
+    if 'roi' not in status_data:
+        print("❌ Status endpoint is missing ROI information")
+        return None
+    return status_data['roi'] or {}
+
 def check_api_roi_endpoints():
     """Test the ROI API endpoints"""
     base_url = "http://localhost:5000"
     
     try:
-        # Check status endpoint
-        response = requests.get(f"{base_url}/api/status")
-        if response.status_code == 200:
-            status_data = response.json()
-            if 'roi' in status_data:
-                print("✅ Status endpoint includes ROI information")
-            else:
-                print("❌ Status endpoint is missing ROI information")
-        else:
-            print(f"❌ Error accessing status endpoint: {response.status_code}")
-        
         # Generate random ROI
         x1 = random.randint(50, 150)
         y1 = random.randint(50, 150)
@@ -83,7 +114,6 @@ def check_api_roi_endpoints():
         
         print(f"Setting ROI to: ({x1}, {y1}, {x2}, {y2}) with entry direction: {entry_direction}")
         
-        # Set ROI
         roi_data = {
             "x1": x1,
             "y1": y1,
@@ -92,26 +122,41 @@ def check_api_roi_endpoints():
             "entry_direction": entry_direction
         }
         
-        response = requests.post(
-            f"{base_url}/api/cameras/0/roi", 
-            json=roi_data,
-            headers={"Content-Type": "application/json"}
-        )
+        # Set the ROI and read it back in one round-trip
+        results = post_roi_batch(base_url, [{"op": "set", "data": roi_data}, {"op": "get_status"}])
+        if results is None:
+            return False
+        set_result, status_result = results
         
-        if response.status_code == 200:
+        if set_result.get('success'):
             print("✅ ROI set successfully")
         else:
-            print(f"❌ Failed to set ROI: {response.status_code} - {response.text}")
+            print(f"❌ Failed to set ROI: {set_result.get('error')}")
             return False
         
-        # Verify ROI was saved to the database
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        roi = status_result.get('roi') or {}
+        if (roi.get('coords') == {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2} and
+                roi.get('entry_direction') == entry_direction):
+            print("✅ ROI is correctly returned by the server")
+        else:
+            print(f"❌ ROI on the server doesn't match what was set: {roi}")
+            return False
         
-        cursor.execute("SELECT * FROM camera_config WHERE camera_id = '0';")
+        # The dashboard reads the ROI from the status endpoint
+        roi = get_status_roi(base_url)
+        if roi is None:
+            return False
+        if (roi.get('coords') == {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2} and
+                roi.get('entry_direction') == entry_direction):
+            print("✅ ROI is correctly returned in the status endpoint")
+        else:
+            print(f"❌ ROI in status doesn't match what was set: {roi}")
+            return False
+        
+        # Verify ROI was saved to the database
+        cursor = db().cursor()
+        cursor.execute(_CAMERA_CONFIG_ROW_QUERY, ('0',))
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             print(f"✅ ROI was saved to the database: {row}")
@@ -119,41 +164,37 @@ def check_api_roi_endpoints():
             print("❌ ROI was not saved to the database")
             return False
         
-        # Check if the ROI is returned in the status
-        response = requests.get(f"{base_url}/api/status")
-        if response.status_code == 200:
-            status_data = response.json()
-            if 'roi' in status_data and status_data['roi'].get('coords'):
-                roi_coords = status_data['roi']['coords']
-                if (roi_coords['x1'] == x1 and roi_coords['y1'] == y1 and 
-                    roi_coords['x2'] == x2 and roi_coords['y2'] == y2 and
-                    status_data['roi']['entry_direction'] == entry_direction):
-                    print("✅ ROI is correctly returned in the status endpoint")
-                else:
-                    print(f"❌ ROI in status doesn't match what was set: {roi_coords}")
-                    return False
-            else:
-                print("❌ ROI information missing from status endpoint")
-                return False
-        else:
-            print(f"❌ Error accessing status endpoint: {response.status_code}")
+        # Clear the ROI and read it back in one round-trip
+        results = post_roi_batch(base_url, [{"op": "clear"}, {"op": "get_status"}])
+        if results is None:
             return False
+        clear_result, status_result = results
         
-        # Now clear the ROI
-        response = requests.post(f"{base_url}/api/cameras/0/roi/clear")
-        if response.status_code == 200:
+        if clear_result.get('success'):
             print("✅ ROI cleared successfully")
         else:
-            print(f"❌ Failed to clear ROI: {response.status_code} - {response.text}")
+            print(f"❌ Failed to clear ROI: {clear_result.get('error')}")
             return False
         
-        # Verify ROI was removed from the database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        roi = status_result.get('roi') or {}
+        if not roi.get('coords'):
+            print("✅ ROI is correctly shown as cleared by the server")
+        else:
+            print(f"❌ ROI still present on the server after clearing: {roi}")
+            return False
         
-        cursor.execute("SELECT * FROM camera_config WHERE camera_id = '0';")
+        roi = get_status_roi(base_url)
+        if roi is None:
+            return False
+        if not roi.get('coords'):
+            print("✅ ROI is correctly shown as cleared in the status endpoint")
+        else:
+            print(f"❌ ROI still appears in status after clearing: {roi}")
+            return False
+        
+        # Verify ROI was removed from the database
+        cursor.execute(_CAMERA_CONFIG_ROW_QUERY, ('0',))
         row = cursor.fetchone()
-        conn.close()
         
         if not row:
             print("✅ ROI was removed from the database")
@@ -161,19 +202,6 @@ def check_api_roi_endpoints():
             print(f"❌ ROI was not removed from the database: {row}")
             return False
         
-        # Check if the ROI is no longer in the status
-        response = requests.get(f"{base_url}/api/status")
-        if response.status_code == 200:
-            status_data = response.json()
-            if 'roi' in status_data and not status_data['roi'].get('coords'):
-                print("✅ ROI is correctly shown as cleared in the status endpoint")
-            else:
-                print(f"❌ ROI still appears in status after clearing: {status_data.get('roi')}")
-                return False
-        else:
-            print(f"❌ Error accessing status endpoint: {response.status_code}")
-            return False
-        
         return True
         
     except Exception as e:
@@ -193,6 +221,10 @@ def main():
         print("\n✅ All ROI persistence tests passed!")
     else:
         print("\n❌ Some ROI persistence tests failed.")
+    
+    if _DB_CONN is not None:
+        _DB_CONN.close()
+    SESSION.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
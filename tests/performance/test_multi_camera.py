@@ -8,8 +8,7 @@ import threading
 import cv2
 import psutil
 import argparse
-from collections import deque
-import matplotlib.pyplot as plt
+import multiprocessing
 import numpy as np
 
 # Add the parent directory to the path so we can import modules
@@ -21,10 +20,56 @@ from managers.detection_manager import DetectionManager
 from managers.dashboard_manager import DashboardManager
 from managers.database_manager import DatabaseManager
 
+# Number of resource samples kept (~80 minutes at one sample every 0.5s)
+HISTORY_SIZE = 10_000
+
+# Stop early once CPU stays above this level for this many consecutive samples
+OVERLOAD_CPU_PERCENT = 95
+OVERLOAD_SAMPLES = 10
+
 def print_separator():
     """Print a separator line"""
     print('-' * 80)
 
+def render_plots(cpu_history, memory_history, plot_file):
+    """
+    Render the CPU and memory usage plots to a file
+    
+    Runs in a separate process so matplotlib is only loaded once the
+    measurement window is over and does not delay camera teardown.
+    
+    Args:
+        cpu_history: Sequence of CPU usage samples (%)
+        memory_history: Sequence of memory usage samples (%)
+        plot_file: Path of the image file to write
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    plt.figure(figsize=(12, 6))
+    
+    # CPU plot
+    plt.subplot(1, 2, 1)
+    plt.plot(cpu_history)
+    plt.title('CPU Usage')
+    plt.xlabel('Time (0.5s intervals)')
+    plt.ylabel('CPU %')
+    plt.ylim(0, 100)
+    plt.grid(True)
+    
+    # Memory plot
+    plt.subplot(1, 2, 2)
+    plt.plot(memory_history)
+    plt.title('Memory Usage')
+    plt.xlabel('Time (0.5s intervals)')
+    plt.ylabel('Memory %')
+    plt.ylim(0, 100)
+    plt.grid(True)
+    
+    plt.tight_layout()
+    plt.savefig(plot_file)
+
 def run_performance_test(num_cameras=2, duration=30, show_video=False):
     """
     Run a performance test with multiple cameras
@@ -61,19 +106,29 @@ def run_performance_test(num_cameras=2, duration=30, show_video=False):
     time.sleep(2)
     
     # Track resource usage
-    cpu_history = deque(maxlen=100)
-    memory_history = deque(maxlen=100)
+    # Row 0 holds CPU %, row 1 memory %; written as a ring buffer
+    resource_history = np.empty((2, HISTORY_SIZE), dtype=np.float32)
+    sample_count = 0
     
     # Start resource monitoring thread
     stop_monitoring = threading.Event()
+    overload_detected = threading.Event()
     
     def monitor_resources():
-        while not stop_monitoring.is_set():
-            cpu_percent = psutil.cpu_percent(interval=0.5)
+        nonlocal sample_count
+        high_cpu_samples = 0
+        # Prime the non-blocking counter; later calls report usage since the previous one
+        psutil.cpu_percent(interval=None)
+        while not stop_monitoring.wait(0.5):
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory_percent = psutil.virtual_memory().percent
             
-            cpu_history.append(cpu_percent)
-            memory_history.append(memory_percent)
+            resource_history[:, sample_count % HISTORY_SIZE] = (cpu_percent, memory_percent)
+            sample_count += 1
+            
+            high_cpu_samples = high_cpu_samples + 1 if cpu_percent > OVERLOAD_CPU_PERCENT else 0
+            if high_cpu_samples >= OVERLOAD_SAMPLES:
+                overload_detected.set()
             
             print(f"CPU: {cpu_percent:.1f}%, Memory: {memory_percent:.1f}%", end='\r')
     
@@ -81,42 +136,46 @@ def run_performance_test(num_cameras=2, duration=30, show_video=False):
     monitor_thread.daemon = True
     monitor_thread.start()
     
-    # Start video display thread if requested
-    stop_display = threading.Event()
+    # Start detection
+    print("Starting multi-camera detection")
+    detection_manager.start_all()
     
-    if show_video:
-        def display_frames():
-            while not stop_display.is_set():
-                cameras = camera_registry.get_active_cameras()
-                
+    # Wait for the specified duration; frames are shown from this (main) thread
+    # because OpenCV's GUI functions are not thread-safe on every platform
+    print(f"Running for {duration} seconds...")
+    deadline = time.monotonic() + duration
+    try:
+        if show_video:
+            cameras = camera_registry.get_active_cameras()
+            for camera_id in cameras:
+                cv2.namedWindow(f"Camera {camera_id}")
+            
+            while not overload_detected.is_set() and time.monotonic() < deadline:
+                # Block until each camera publishes a new frame instead of re-showing a stale one
                 for camera_id, camera in cameras.items():
-                    frame = camera.get_latest_frame()
+                    frame = camera.wait_for_frame(timeout=0.03)
                     if frame is not None:
                         cv2.imshow(f"Camera {camera_id}", frame)
                 
                 if cv2.waitKey(1) & 0xFF == ord('q'):
+                    # Close the windows but keep measuring for the full duration
+                    cv2.destroyAllWindows()
                     break
                 
-                time.sleep(0.03)  # ~30 FPS display
+                if not cameras:
+                    overload_detected.wait(0.03)
         
-        display_thread = threading.Thread(target=display_frames)
-        display_thread.daemon = True
-        display_thread.start()
-    
-    # Start detection
-    print("Starting multi-camera detection")
-    detection_manager.start_all()
-    
-    # Wait for the specified duration
-    print(f"Running for {duration} seconds...")
-    time.sleep(duration)
+        remaining = deadline - time.monotonic()
+        if overload_detected.wait(max(0, remaining)):
+            print(f"\nCPU above {OVERLOAD_CPU_PERCENT}% for {OVERLOAD_SAMPLES} consecutive samples, stopping early")
+    except KeyboardInterrupt:
+        print("\nInterrupted, stopping early")
     
     # Stop detection
     detection_manager.stop_all()
     
-    # Stop monitoring and display
+    # Stop monitoring
     stop_monitoring.set()
-    stop_display.set()
     monitor_thread.join(timeout=1.0)
     
     if show_video:
@@ -128,17 +187,23 @@ def run_performance_test(num_cameras=2, duration=30, show_video=False):
     print("Performance Test Results:")
     print_separator()
     
+    # Oldest-first view of the recorded samples
+    if sample_count > HISTORY_SIZE:
+        cpu_history, memory_history = np.roll(resource_history, -(sample_count % HISTORY_SIZE), axis=1)
+    else:
+        cpu_history, memory_history = resource_history[:, :sample_count]
+    
     # CPU statistics
-    avg_cpu = sum(cpu_history) / len(cpu_history) if cpu_history else 0
-    max_cpu = max(cpu_history) if cpu_history else 0
-    min_cpu = min(cpu_history) if cpu_history else 0
+    avg_cpu = float(cpu_history.mean()) if sample_count else 0
+    max_cpu = float(cpu_history.max()) if sample_count else 0
+    min_cpu = float(cpu_history.min()) if sample_count else 0
     
     print(f"CPU Usage: Avg: {avg_cpu:.1f}%, Max: {max_cpu:.1f}%, Min: {min_cpu:.1f}%")
     
     # Memory statistics
-    avg_memory = sum(memory_history) / len(memory_history) if memory_history else 0
-    max_memory = max(memory_history) if memory_history else 0
-    min_memory = min(memory_history) if memory_history else 0
+    avg_memory = float(memory_history.mean()) if sample_count else 0
+    max_memory = float(memory_history.max()) if sample_count else 0
+    min_memory = float(memory_history.min()) if sample_count else 0
     
     print(f"Memory Usage: Avg: {avg_memory:.1f}%, Max: {max_memory:.1f}%, Min: {min_memory:.1f}%")
     
@@ -151,37 +216,16 @@ def run_performance_test(num_cameras=2, duration=30, show_video=False):
     print(f"Detection manager tracked avg CPU: {resources['avg_cpu']:.1f}%")
     print(f"Detection manager tracked avg Memory: {resources['avg_memory']:.1f}%")
     
-    # Plot results
-    plt.figure(figsize=(12, 6))
-    
-    # CPU plot
-    plt.subplot(1, 2, 1)
-    plt.plot(cpu_history)
-    plt.title('CPU Usage')
-    plt.xlabel('Time (0.5s intervals)')
-    plt.ylabel('CPU %')
-    plt.ylim(0, 100)
-    plt.grid(True)
-    
-    # Memory plot
-    plt.subplot(1, 2, 2)
-    plt.plot(memory_history)
-    plt.title('Memory Usage')
-    plt.xlabel('Time (0.5s intervals)')
-    plt.ylabel('Memory %')
-    plt.ylim(0, 100)
-    plt.grid(True)
-    
-    plt.tight_layout()
-    
-    # Save the plot
+    # Render plots in the background while the cameras shut down
     plot_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'multi_camera_performance.png')
-    plt.savefig(plot_file)
-    print(f"Performance plot saved to: {plot_file}")
+    plot_process = multiprocessing.Process(target=render_plots, args=(cpu_history, memory_history, plot_file))
+    plot_process.start()
     
     # Check if we are likely to exceed system capacity
     feasibility = ""
-    if avg_cpu > 90:
+    if overload_detected.is_set():
+        feasibility = "NOT feasible - CPU saturated"
+    elif avg_cpu > 90:
         feasibility = "NOT feasible - CPU usage too high"
     elif avg_memory > 90:
         feasibility = "NOT feasible - Memory usage too high"
@@ -199,6 +243,12 @@ def run_performance_test(num_cameras=2, duration=30, show_video=False):
     # Clean up
     camera_registry.stop_all_cameras()
     
+    plot_process.join()
+    if plot_process.exitcode == 0:
+        print(f"Performance plot saved to: {plot_file}")
+    else:
+        print(f"Failed to render performance plot (exit code {plot_process.exitcode})")
+    
     return {
         "avg_cpu": avg_cpu,
         "max_cpu": max_cpu,
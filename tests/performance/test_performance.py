@@ -7,7 +7,10 @@ import sqlite3
 import psutil
 import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
 import threading
+import concurrent.futures
 import logging
 import json
 import sys
@@ -24,33 +27,76 @@ logging.basicConfig(
 logger = logging.getLogger('zvision-test')
 
 class ZVisionTester:
-    def __init__(self, host='localhost', port=5000):
+    # Concurrent status probes and their upper time bound during the concurrency test
+    POLL_WORKERS = 4
+    POLL_DEADLINE = 10.0
+    
+    # (connect, read) timeout for API calls so a hung server can't stall the run
+    DEFAULT_TIMEOUT = (1.0, 3.0)
+    
+    # Applied to the read-only database connection when it is opened
+    READ_PRAGMAS = ("temp_store=MEMORY", "mmap_size=268435456", "cache_size=-65536")
+    
+    def __init__(self, host='localhost', port=5000, poll_workers=POLL_WORKERS, server_pid=None):
         self.base_url = f"http://{host}:{port}"
+        self.poll_workers = poll_workers
         self.api_url = f"{self.base_url}/api"
         
         # Use absolute path to the database from project root
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
         self.db_path = os.path.join(project_root, "zvision.db")
         
-        self.cpu_samples = []
-        self.memory_samples = []
-        self.response_times = []
+        # Duration of the most recent status request, or None if it failed
+        self.last_response_time = None
         self.process = psutil.Process(os.getpid())
         
+        # ZVision server process whose RSS is sampled, when its PID is known
+        self.server_process = psutil.Process(server_pid) if server_pid else None
+        
+        # Prime the non-blocking CPU counter: cpu_percent(interval=None) returns 0.0 on
+        # its first call and the usage since the previous call afterwards
+        psutil.cpu_percent(interval=None)
+        
+        # Read-only database connection, opened on first query and reused afterwards
+        self._conn = None
+        
+        # Keep-alive session so measured response times exclude TCP setup
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=max(32, poll_workers + 1), max_retries=0))
+        
         logger.info(f"ZVision Tester initialized for {self.base_url}")
         logger.info(f"Using database at: {self.db_path}")
         
+    def close(self):
+        """Close the HTTP session and the database connection"""
+        self.session.close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def get_connection(self):
+        """Get the shared read-only database connection"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+            self._conn.execute("PRAGMA query_only=ON")
+            # Connection-local read tuning; leaves the database file's settings untouched
+            for pragma in self.READ_PRAGMAS:
+                self._conn.execute(f"PRAGMA {pragma}")
+            self._conn.row_factory = sqlite3.Row
+        return self._conn
+    
     def get_system_status(self):
         """Get current system status from API"""
         try:
             start = time.time()
-            response = requests.get(f"{self.api_url}/status")
+            response = self.session.get(f"{self.api_url}/status", timeout=self.DEFAULT_TIMEOUT)
             elapsed = time.time() - start
-            self.response_times.append(elapsed)
+            self.last_response_time = elapsed
             
             if response.status_code == 200:
                 data = response.json()
-                logger.info(f"System status: {json.dumps(data, indent=2)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("System status: %s", json.dumps(data))
                 return data
             else:
                 logger.error(f"Failed to get status: {response.status_code}")
@@ -63,7 +109,7 @@ class ZVisionTester:
         """Toggle detection on or off"""
         endpoint = f"{self.api_url}/detection/{'start' if enable else 'stop'}"
         try:
-            response = requests.post(endpoint)
+            response = self.session.post(endpoint, timeout=self.DEFAULT_TIMEOUT)
             if response.status_code == 200:
                 logger.info(f"Detection {'enabled' if enable else 'disabled'} successfully")
                 return True
@@ -77,7 +123,7 @@ class ZVisionTester:
     def get_recent_metrics(self):
         """Get system metrics from API"""
         try:
-            response = requests.get(f"{self.api_url}/metrics")
+            response = self.session.get(f"{self.api_url}/metrics", timeout=self.DEFAULT_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 logger.info(f"Total Detections: {data.get('total', {}).get('total_detections', 0)}")
@@ -93,10 +139,11 @@ class ZVisionTester:
     def get_recent_detections(self, count=5):
         """Get recent detection events from API"""
         try:
-            response = requests.get(f"{self.api_url}/detections/recent?count={count}")
+            response = self.session.get(f"{self.api_url}/detections/recent?count={count}", timeout=self.DEFAULT_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
-                logger.info(f"Recent detections: {json.dumps(data, indent=2)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Recent detections: %s", json.dumps(data))
                 return data
             else:
                 logger.error(f"Failed to get detections: {response.status_code}")
@@ -105,36 +152,39 @@ class ZVisionTester:
             logger.error(f"Error getting detections: {e}")
             return None
     
+    def iter_events(self, event_type=None, limit=None, batch=1000):
+        """Yield events newest first, fetching batch rows at a time (limit=None for all)"""
+        # SQLite treats a negative LIMIT as no limit, so the SQL text stays the same
+        limit = -1 if limit is None else limit
+        if event_type:
+            query = """
+            SELECT id, timestamp, event_type, direction, extra_data
+            FROM detection_events 
+            WHERE event_type = ?
+            ORDER BY timestamp DESC LIMIT ?
+            """
+            cursor = self.get_connection().execute(query, (event_type, limit))
+        else:
+            query = """
+            SELECT id, timestamp, event_type, direction, extra_data
+            FROM detection_events 
+            ORDER BY timestamp DESC LIMIT ?
+            """
+            cursor = self.get_connection().execute(query, (limit,))
+        
+        while rows := cursor.fetchmany(batch):
+            yield from rows
+    
     def query_database(self, event_type=None, limit=10):
         """Query the SQLite database for events"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            if event_type:
-                query = """
-                SELECT id, timestamp, event_type, direction, extra_data
-                FROM detection_events 
-                WHERE event_type = ?
-                ORDER BY timestamp DESC LIMIT ?
-                """
-                cursor.execute(query, (event_type, limit))
-            else:
-                query = """
-                SELECT id, timestamp, event_type, direction, extra_data
-                FROM detection_events 
-                ORDER BY timestamp DESC LIMIT ?
-                """
-                cursor.execute(query, (limit,))
-            
-            results = cursor.fetchall()
-            conn.close()
+            results = list(self.iter_events(event_type, limit=limit, batch=limit))
             
             # Format and display results
             if results:
                 logger.info(f"Database query results for event_type={event_type}:")
                 for row in results:
-                    logger.info(f"ID: {row[0]}, Time: {row[1]}, Type: {row[2]}, Direction: {row[3]}")
+                    logger.info(f"ID: {row['id']}, Time: {row['timestamp']}, Type: {row['event_type']}, Direction: {row['direction']}")
             else:
                 logger.info(f"No database results for event_type={event_type}")
                 
@@ -143,44 +193,92 @@ class ZVisionTester:
             logger.error(f"Database query error: {e}")
             return []
     
+    def query_counts(self, event_types=None):
+        """Count events per event type (all types if event_types is None) in one query"""
+        try:
+            query = "SELECT event_type, COUNT(*) FROM detection_events"
+            params = ()
+            if event_types:
+                params = tuple(event_types)
+                query += f" WHERE event_type IN ({','.join('?' * len(params))})"
+            query += " GROUP BY event_type"
+            counts = dict(self.get_connection().execute(query, params).fetchall())
+            
+            logger.info(f"Database event counts: {counts}")
+            return counts
+        except Exception as e:
+            logger.error(f"Database count query error: {e}")
+            return {}
+    
     def monitor_resources(self, duration=10, interval=1.0):
         """Monitor CPU and memory usage for specified duration"""
         logger.info(f"Starting resource monitoring for {duration} seconds...")
         
+        # Running totals for this call only, so earlier runs don't skew the averages
+        samples = 0
+        cpu_sum = max_cpu = 0.0
+        mem_sum = max_mem = 0.0
+        rss_samples = 0
+        rss_sum = max_rss = 0.0
+        responses = 0
+        response_sum = max_response = 0.0
+        
         end_time = time.time() + duration
         while time.time() < end_time:
-            # Get CPU and memory usage
+            # Get CPU and memory usage (non-blocking, delta since the previous sample)
             cpu_percent = psutil.cpu_percent(interval=None)
-            memory_info = psutil.virtual_memory()
+            memory_percent = psutil.virtual_memory().percent
+            
+            samples += 1
+            cpu_sum += cpu_percent
+            max_cpu = max(max_cpu, cpu_percent)
+            mem_sum += memory_percent
+            max_mem = max(max_mem, memory_percent)
             
-            self.cpu_samples.append(cpu_percent)
-            self.memory_samples.append(memory_info.percent)
+            logger.info(f"CPU: {cpu_percent}%, Memory: {memory_percent}%")
             
-            logger.info(f"CPU: {cpu_percent}%, Memory: {memory_info.percent}%")
+            # Track the server's own resident memory so leaks show up independently of the host
+            if self.server_process is not None:
+                try:
+                    with self.server_process.oneshot():
+                        rss_mb = self.server_process.memory_info().rss / (1024 * 1024)
+                    rss_samples += 1
+                    rss_sum += rss_mb
+                    max_rss = max(max_rss, rss_mb)
+                except psutil.Error as e:
+                    logger.error(f"Error sampling server process: {e}")
+                    self.server_process = None
             
             # Check API responsiveness during monitoring
+            self.last_response_time = None
             self.get_system_status()
+            if self.last_response_time is not None:
+                responses += 1
+                response_sum += self.last_response_time
+                max_response = max(max_response, self.last_response_time)
             
             time.sleep(interval)
         
         # Calculate and display stats
-        avg_cpu = sum(self.cpu_samples) / len(self.cpu_samples) if self.cpu_samples else 0
-        max_cpu = max(self.cpu_samples) if self.cpu_samples else 0
-        avg_mem = sum(self.memory_samples) / len(self.memory_samples) if self.memory_samples else 0
-        max_mem = max(self.memory_samples) if self.memory_samples else 0
-        avg_response = sum(self.response_times) / len(self.response_times) if self.response_times else 0
-        max_response = max(self.response_times) if self.response_times else 0
+        avg_cpu = cpu_sum / samples if samples else 0
+        avg_mem = mem_sum / samples if samples else 0
+        avg_response = response_sum / responses if responses else 0
         
         logger.info(f"Resource monitoring complete:")
         logger.info(f"Average CPU: {avg_cpu:.1f}%, Max CPU: {max_cpu:.1f}%")
         logger.info(f"Average Memory: {avg_mem:.1f}%, Max Memory: {max_mem:.1f}%")
         logger.info(f"Average API Response: {avg_response:.3f}s, Max: {max_response:.3f}s")
+        avg_rss = rss_sum / rss_samples if rss_samples else None
+        if rss_samples:
+            logger.info(f"Process RSS: {avg_rss:.1f} MB, Max {max_rss:.1f} MB")
         
         return {
             "avg_cpu": avg_cpu,
             "max_cpu": max_cpu, 
             "avg_memory": avg_mem,
             "max_memory": max_mem,
+            "avg_rss_mb": avg_rss,
+            "max_rss_mb": max_rss if rss_samples else None,
             "avg_response": avg_response,
             "max_response": max_response
         }
@@ -192,49 +290,62 @@ class ZVisionTester:
         # Enable detection
         self.toggle_detection(True)
         
-        # Set up API polling in a separate thread
+        # Keep several status probes in flight until the stream check finishes
+        # (or the deadline passes) so the server sees real concurrent load
         stop_event = threading.Event()
+        deadline = time.monotonic() + self.POLL_DEADLINE
         response_times = []
         
         def poll_api():
-            while not stop_event.is_set():
+            while not stop_event.is_set() and time.monotonic() < deadline:
                 try:
-                    start = time.time()
-                    response = requests.get(f"{self.api_url}/status")
-                    elapsed = time.time() - start
+                    start = time.perf_counter()
+                    response = self.session.get(f"{self.api_url}/status", timeout=self.DEFAULT_TIMEOUT)
+                    elapsed = time.perf_counter() - start
                     if response.status_code == 200:
                         response_times.append(elapsed)
-                    time.sleep(0.2)  # Poll at 5 Hz
                 except Exception as e:
                     logger.error(f"Error polling API: {e}")
+                    stop_event.wait(0.2)
         
-        # Start API polling thread
-        poll_thread = threading.Thread(target=poll_api)
-        poll_thread.daemon = True
-        poll_thread.start()
+        # Start API pollers
+        poll_executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.poll_workers)
+        for _ in range(self.poll_workers):
+            poll_executor.submit(poll_api)
         
         # Access video stream in parallel
         try:
             logger.info("Testing video stream access...")
             start = time.time()
-            response = requests.get(f"{self.base_url}/video_feed", stream=True, timeout=2)
+            response = self.session.get(f"{self.base_url}/video_feed", stream=True, timeout=2)
             
-            # Read a few frames to test streaming
+            # Read a few frames to test streaming, scanning the raw socket data for
+            # boundary markers (including ones split across two reads)
+            marker = b'--frame'
+            buffer = bytearray()
             frame_count = 0
-            for chunk in response.iter_content(chunk_size=10*1024):
-                frame_count += chunk.count(b'--frame')
-                if frame_count >= 5 or time.time() - start > 5:
+            while frame_count < 5 and time.time() - start <= 5:
+                chunk = response.raw.read1(64 * 1024)
+                if not chunk:
                     break
+                buffer += chunk
+                offset = 0
+                while (index := buffer.find(marker, offset)) != -1:
+                    frame_count += 1
+                    offset = index + len(marker)
+                # Keep only a tail that could still be the start of a marker
+                del buffer[:max(offset, len(buffer) - len(marker) + 1)]
             
+            response.close()
             logger.info(f"Read {frame_count} frames from video stream")
-        except requests.exceptions.ReadTimeout:
+        except (requests.exceptions.ReadTimeout, ReadTimeoutError):
             logger.info("Video stream timeout after receiving some frames (expected)")
         except Exception as e:
             logger.error(f"Error accessing video stream: {e}")
         
         # Stop API polling
         stop_event.set()
-        poll_thread.join(timeout=1)
+        poll_executor.shutdown(wait=True)
         
         # Calculate response time stats
         if response_times:
@@ -252,6 +363,15 @@ class ZVisionTester:
         logger.info("Monitoring resources during concurrent operation...")
         return self.monitor_resources(duration=10, interval=1.0)
     
+    def _await_state(self, desired, timeout=2.0):
+        """Poll status until detection_active equals desired or timeout; returns the last status"""
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.get_system_status()
+            if (status and status.get("detection_active") == desired) or time.monotonic() >= deadline:
+                return status
+            time.sleep(0.02)
+    
     def run_detection_toggle_tests(self):
         """Test toggling detection on and off"""
         logger.info("Starting detection toggle tests...")
@@ -263,8 +383,7 @@ class ZVisionTester:
         # Test disabling detection
         logger.info("Testing detection disable...")
         self.toggle_detection(False)
-        time.sleep(2)
-        status = self.get_system_status()
+        status = self._await_state(False)
         if status and status.get("detection_active") == False:
             logger.info("Detection disabled successfully")
         else:
@@ -277,8 +396,7 @@ class ZVisionTester:
         # Test enabling detection
         logger.info("Testing detection enable...")
         self.toggle_detection(True)
-        time.sleep(2)
-        status = self.get_system_status()
+        status = self._await_state(True)
         if status and status.get("detection_active") == True:
             logger.info("Detection enabled successfully")
         else:
@@ -292,13 +410,12 @@ class ZVisionTester:
         logger.info("Testing rapid detection toggle...")
         for i in range(3):
             self.toggle_detection(False)
-            time.sleep(0.5)
+            self._await_state(False)
             self.toggle_detection(True)
-            time.sleep(0.5)
+            self._await_state(True)
         
         # Get final status
-        time.sleep(1)
-        final_status = self.get_system_status()
+        final_status = self._await_state(True)
         final_active = final_status.get("detection_active", False) if final_status else False
         
         logger.info(f"Toggle tests complete. Final detection state: {'Active' if final_active else 'Inactive'}")
@@ -323,19 +440,14 @@ class ZVisionTester:
         """Verify database is logging detection events"""
         logger.info("Running database verification...")
         
-        # Query different event types
-        events_start = self.query_database("detection_start", 5)
-        events_end = self.query_database("detection_end", 5)
-        events_direction = self.query_database("direction", 5)
-        
-        # Get most recent events
-        all_events = self.query_database(limit=10)
+        # Count every event type in one grouped query; the total is their sum
+        counts = self.query_counts()
         
         return {
-            "detection_start": len(events_start),
-            "detection_end": len(events_end),
-            "direction": len(events_direction),
-            "all_events": len(all_events)
+            "detection_start": counts.get("detection_start", 0),
+            "detection_end": counts.get("detection_end", 0),
+            "direction": counts.get("direction", 0),
+            "all_events": sum(counts.values())
         }
     
     def run_complete_test_suite(self):
@@ -425,26 +537,33 @@ def main():
     parser = argparse.ArgumentParser(description="ZVision Performance and Concurrency Test")
     parser.add_argument("--host", default="localhost", help="ZVision server host")
     parser.add_argument("--port", default=5000, type=int, help="ZVision server port")
+    parser.add_argument("--poll-workers", default=ZVisionTester.POLL_WORKERS, type=int,
+                       help="Concurrent status probes during the concurrency test")
+    parser.add_argument("--server-pid", type=int, help="PID of the ZVision server to sample RSS from")
     parser.add_argument("--test", choices=["all", "status", "concurrency", "toggle", "database", "resources"], 
                        default="all", help="Test to run")
     args = parser.parse_args()
     
-    tester = ZVisionTester(host=args.host, port=args.port)
+    tester = ZVisionTester(host=args.host, port=args.port, poll_workers=args.poll_workers,
+                           server_pid=args.server_pid)
     
-    if args.test == "all":
-        tester.run_complete_test_suite()
-    elif args.test == "status":
-        tester.get_system_status()
-        tester.get_recent_metrics()
-        tester.get_recent_detections()
-    elif args.test == "concurrency":
-        tester.check_concurrent_operation()
-    elif args.test == "toggle":
-        tester.run_detection_toggle_tests()
-    elif args.test == "database":
-        tester.run_database_verification()
-    elif args.test == "resources":
-        tester.monitor_resources(duration=30, interval=1.0)
+    try:
+        if args.test == "all":
+            tester.run_complete_test_suite()
+        elif args.test == "status":
+            tester.get_system_status()
+            tester.get_recent_metrics()
+            tester.get_recent_detections()
+        elif args.test == "concurrency":
+            tester.check_concurrent_operation()
+        elif args.test == "toggle":
+            tester.run_detection_toggle_tests()
+        elif args.test == "database":
+            tester.run_database_verification()
+        elif args.test == "resources":
+            tester.monitor_resources(duration=30, interval=1.0)
+    finally:
+        tester.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -6,6 +6,7 @@ import os
 import sqlite3
 import json
 import tempfile
+import numpy as np
 from unittest import mock
 
 # Import the module to test
@@ -18,15 +19,19 @@ class TestAnalyticsEngine(unittest.TestCase):
     Test cases for the analytics engine
     """
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Set up a test database and initialize the analytics engine
+        Set up a test database once and initialize the analytics engine
+        
+        The tests only read through the analytics engine, so they can share
+        the fixture without per-test isolation.
         """
         # Create a temporary database file
-        self.db_fd, self.db_path = tempfile.mkstemp()
+        cls.db_fd, cls.db_path = tempfile.mkstemp()
         
         # Initialize the database with test schema and data
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(cls.db_path)
         cursor = conn.cursor()
         
         # Create detection_events table
@@ -39,6 +44,9 @@ class TestAnalyticsEngine(unittest.TestCase):
                 direction TEXT
             )
         ''')
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_detection_events_type_ts ON detection_events(event_type, timestamp DESC)"
+        )
         
         # Insert some test detection events
         test_data = [
@@ -51,25 +59,27 @@ class TestAnalyticsEngine(unittest.TestCase):
             ('test_camera', 'entry', '2025-03-29 09:30:00', 'left_to_right'),
         ]
         
-        for event in test_data:
-            cursor.execute(
+        # Throwaway database: skip fsync and insert all rows in one transaction
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA journal_mode=MEMORY")
+        with conn:
+            cursor.executemany(
                 "INSERT INTO detection_events (camera_id, event_type, timestamp, direction) VALUES (?, ?, ?, ?)",
-                event
+                test_data
             )
-        
-        conn.commit()
         conn.close()
         
         # Initialize the analytics engine with our test database
-        config = {'database': {'path': self.db_path}}
+        config = {'database': {'path': cls.db_path}}
         analytics_engine.init(config)
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """
         Clean up test database
         """
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
+        os.close(cls.db_fd)
+        os.unlink(cls.db_path)
     
     def test_get_camera_entry_counts(self):
         """
@@ -167,19 +177,16 @@ class TestAnalyticsEngine(unittest.TestCase):
             height=height
         )
         
+        heatmap_array = np.asarray(heatmap)
+        
         # Check that the heatmap has the right dimensions
-        self.assertEqual(len(heatmap), height)
-        self.assertEqual(len(heatmap[0]), width)
-        
-        # Check that the heatmap contains numeric values
-        for row in heatmap:
-            for value in row:
-                self.assertIsInstance(value, int)
-                
+        self.assertEqual(heatmap_array.shape, (height, width))
+        
+        # Check that the heatmap contains integer values
+        self.assertTrue(np.issubdtype(heatmap_array.dtype, np.integer))
+        
         # Verify that there are some non-zero values (should be for visual interest)
-        flat_map = [value for row in heatmap for value in row]
-        non_zero_count = sum(1 for value in flat_map if value > 0)
-        self.assertGreater(non_zero_count, 0)
+        self.assertGreater(int((heatmap_array > 0).sum()), 0)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -3,22 +3,26 @@
 
 import requests
 import json
-import time
+import concurrent.futures
+
+# Keep-alive session shared by every request in this script
+SESSION = requests.Session()
 
 def print_json(data):
     """Print JSON data in a readable format"""
     print(json.dumps(data, indent=4))
 
-def test_endpoint(base_url, endpoint, method="GET", expected_status=200, params=None, data=None):
-    """Test an API endpoint and print results"""
+def test_endpoint(base_url, endpoint, method="GET", expected_status=200, params=None, data=None, client=None):
+    """Test an API endpoint and print results (client defaults to the shared SESSION)"""
+    client = client or SESSION
     url = f"{base_url}{endpoint}"
     print(f"\nTesting {method} {url}")
     
     try:
         if method == "GET":
-            response = requests.get(url, params=params)
+            response = client.get(url, params=params)
         elif method == "POST":
-            response = requests.post(url, json=data)
+            response = client.post(url, json=data)
         else:
             print(f"Unsupported method: {method}")
             return False
@@ -65,39 +69,49 @@ def main():
         {"url": "/api/detection/start", "method": "POST"},
     ]
     
-    success_count = 0
-    for endpoint in endpoints:
-        if test_endpoint(
+    def run(endpoint):
+        return test_endpoint(
             base_url, 
             endpoint["url"], 
             method=endpoint["method"], 
             params=endpoint.get("params"), 
-            data=endpoint.get("data")
-        ):
-            success_count += 1
-        
-        # Brief pause to avoid overwhelming the server
-        time.sleep(0.5)
+            data=endpoint.get("data"),
+            client=SESSION
+        )
+    
+    # Read-only GETs are independent, so probe them concurrently; POSTs change
+    # detection state and run afterwards in their listed order
+    gets = [endpoint for endpoint in endpoints if endpoint["method"] == "GET"]
+    posts = [endpoint for endpoint in endpoints if endpoint["method"] != "GET"]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(run, gets))
+    results.extend(run(endpoint) for endpoint in posts)
+    success_count = sum(results)
     
     print(f"\nSummary: {success_count}/{len(endpoints)} endpoints tested successfully")
     
     # Check video feed (special case - returns a stream)
     print("\nChecking video feed (MJPEG stream)...")
     try:
-        response = requests.get(f"{base_url}/video_feed", stream=True, timeout=2)
+        # Only the headers are needed, so ask for them without a frame payload
+        response = SESSION.head(f"{base_url}/video_feed", timeout=2, allow_redirects=True)
+        if response.status_code == 405:
+            # HEAD not supported: start the stream and close it as soon as the headers arrive
+            response = SESSION.get(f"{base_url}/video_feed", stream=True, timeout=2, headers={"Range": "bytes=0-0"})
+            response.close()
+        
         # Just check the headers to see if it's a multipart response
         content_type = response.headers.get('Content-Type', '')
         is_mjpeg = 'multipart/x-mixed-replace' in content_type
         
         if is_mjpeg:
             print(f"Video feed working! Content-Type: {content_type}")
-            # Close the connection
-            response.close()
         else:
             print(f"Video feed not returning proper MJPEG stream. Content-Type: {content_type}")
     except Exception as e:
         print(f"Error checking video feed: {e}")
     
+    SESSION.close()
     print("\nAPI endpoint testing complete!")
 
 if __name__ == "__main__":
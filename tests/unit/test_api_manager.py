@@ -4,17 +4,25 @@
 import threading
 import time
 import json
+import functools
 import numpy as np
 import cv2
 from managers.resource_provider import ResourceProvider
 from managers.api_manager import APIManager
 
+@functools.lru_cache(maxsize=1)
+def _build_test_frame():
+    """Render the mock camera image once; read-only so every user can share it"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(frame, "Test Camera Feed", (50, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    frame.flags.writeable = False
+    return frame
+
 # Mock classes for testing
 class MockCameraManager:
     def __init__(self):
-        # Create a test image
-        self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
-        cv2.putText(self.frame, "Test Camera Feed", (50, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        # Shared test image
+        self.frame = _build_test_frame()
     
     def get_latest_frame(self):
         return self.frame
@@ -84,25 +92,29 @@ class MockDatabaseManager:
         pass
     
     def get_events(self, limit=50):
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         events = []
         for i in range(min(5, limit)):
             events.append({
                 "id": i + 1,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp,
                 "type": "test_event",
                 "data": json.dumps({"test": True, "value": i})
             })
         return events
     
     def get_recent_detection_events(self, limit=10):
+        # Every mock event shares the same timestamp and details payload
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        details = json.dumps({"confidence": 0.95, "position": [100, 200]})
         events = []
         for i in range(min(5, limit)):
             events.append({
                 "id": i + 1,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp,
                 "event_type": "detection",
                 "direction": "left_to_right" if i % 2 == 0 else "right_to_left",
-                "details": json.dumps({"confidence": 0.95, "position": [100, 200]})
+                "details": details
             })
         return events
 
@@ -138,18 +150,14 @@ def main():
     logger.info("  - Frame API: http://localhost:5000/api/frame/current")
     logger.info("Press Ctrl+C to stop")
     
+    stop_event = threading.Event()
     try:
-        # Keep main thread alive
-        while True:
-            time.sleep(1)
-            
-            # Toggle person detected every 5 seconds for testing
-            if int(time.time()) % 10 < 5:
-                detection.person_detected = True
-            else:
-                detection.person_detected = False
+        # Keep main thread alive, toggling person detected every 5 seconds for testing
+        while not stop_event.wait(5.0):
+            detection.person_detected = not detection.person_detected
     
     except KeyboardInterrupt:
+        stop_event.set()
         logger.info("Test interrupted by user")
     
     logger.info("APIManager test completed")
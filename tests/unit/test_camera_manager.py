@@ -7,6 +7,9 @@ import cv2
 import time
 import sys
 
+# Progress is logged once per this many captured frames
+LOG_EVERY_FRAMES = 30
+
 def main():
     # Initialize ResourceProvider
     rp = ResourceProvider("config.yaml")
@@ -32,16 +35,18 @@ def main():
             # Get frame with timeout
             frame = cam.get_frame(block=True, timeout=1.0)
             
-            if frame is not None:
-                frame_count += 1
-                
-                # Save the first frame as a sample
-                if frame_count == 1:
-                    logger.info("Saving sample frame to sample_frame.jpg")
-                    cv2.imwrite("sample_frame.jpg", frame)
+            # The blocking get paces the loop at the camera's frame rate
+            if frame is None:
+                continue
+            frame_count += 1
+            
+            # Save the first frame as a sample
+            if frame_count == 1:
+                logger.info("Saving sample frame to sample_frame.jpg")
+                cv2.imwrite("sample_frame.jpg", frame)
             
-            logger.info(f"Captured frames: {frame_count}")
-            time.sleep(0.1)  # Small delay
+            if frame_count % LOG_EVERY_FRAMES == 0:
+                logger.info(f"Captured frames: {frame_count}")
     
     except KeyboardInterrupt:
         logger.info("Test interrupted by user")
@@ -12,6 +12,9 @@ def main():
     logger = rp.get_logger()
     logger.info("Starting DatabaseManager test")
     
+    # Use a throwaway in-memory database instead of the configured file
+    rp.get_config().setdefault('database', {})['path'] = 'file:zvision_test?mode=memory&cache=shared'
+    
     # Initialize DatabaseManager
     db = DatabaseManager(rp)
     
@@ -21,6 +24,12 @@ def main():
     success = db.log_event("test_event", test_event_data)
     logger.info(f"Event logging successful: {success}")
     
+    # Test logging a batch of events in one transaction
+    logger.info("Testing log_events")
+    batch = [("test_batch_event", {"index": i}) for i in range(5)]
+    success = db.log_events(batch)
+    logger.info(f"Batch event logging successful: {success}")
+    
     # Get recent events
     logger.info("Testing get_events")
     events = db.get_events(10)
@@ -31,6 +40,9 @@ def main():
         logger.info(f"Event ID: {event['id']}, Type: {event['type']}, Timestamp: {event['timestamp']}")
         logger.info(f"Event Data: {event['data']}")
     
+    # Release the in-memory database
+    db.close()
+    
     logger.info("DatabaseManager test completed")
 
 if __name__ == "__main__":
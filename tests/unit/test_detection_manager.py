@@ -4,6 +4,7 @@
 import cv2
 import numpy as np
 import time
+import functools
 import threading
 from managers.resource_provider import ResourceProvider
 from managers.camera_manager import CameraManager
@@ -11,25 +12,42 @@ from managers.dashboard_manager import DashboardManager
 from managers.database_manager import DatabaseManager
 from managers.detection_manager import DetectionManager
 
+@functools.lru_cache(maxsize=None)
+def _build_test_sequence(test_image_path):
+    """
+    Render the moving test sequence once per image path
+    
+    Args:
+        test_image_path: Path to the background image
+        
+    Returns:
+        numpy.ndarray: Read-only (frames, height, width, 3) array shared by all mocks
+    """
+    test_image = cv2.imread(test_image_path)
+    if test_image is None:
+        # Create a black test image with a white rectangle as fallback
+        test_image = np.zeros((480, 640, 3), dtype=np.uint8)
+        cv2.rectangle(test_image, (100, 100), (300, 300), (255, 255, 255), -1)
+    
+    sequence = np.repeat(test_image[np.newaxis], 30, axis=0)
+    
+    # Draw a "person" moving from left to right: a filled green box spanning
+    # columns offset..offset+100 and rows 200..350 of frame i, where offset = i * 20
+    offsets = np.arange(len(sequence)) * 20
+    columns = np.arange(sequence.shape[2])
+    in_box = (columns >= offsets[:, None]) & (columns <= offsets[:, None] + 100)
+    band = sequence[:, 200:351]
+    band[...] = np.where(in_box[:, None, :, None], np.array([0, 255, 0], dtype=np.uint8), band)
+    sequence.flags.writeable = False
+    return sequence
+
 class MockCameraManager:
     """
     Mock camera manager that provides test images
     """
     def __init__(self, test_image_path):
-        self.test_image = cv2.imread(test_image_path)
-        if self.test_image is None:
-            # Create a black test image with a white rectangle as fallback
-            self.test_image = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.rectangle(self.test_image, (100, 100), (300, 300), (255, 255, 255), -1)
-        
-        # Create a moving test sequence
-        self.test_sequence = []
-        for i in range(30):
-            img = self.test_image.copy()
-            # Draw a "person" moving from left to right
-            offset = i * 20
-            cv2.rectangle(img, (offset, 200), (offset + 100, 350), (0, 255, 0), -1)
-            self.test_sequence.append(img)
+        # Moving test sequence, shared rather than copied per instance
+        self.test_sequence = _build_test_sequence(test_image_path)
 
     def get_latest_frame(self):
         # Return the current frame from sequence based on time
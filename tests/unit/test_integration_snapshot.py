@@ -11,6 +11,7 @@ import cv2
 import numpy as np
 import sqlite3
 import threading
+import functools
 
 # Import required modules
 from managers.resource_provider import ResourceProvider
@@ -19,6 +20,20 @@ from managers.detection_manager import DetectionManager
 from managers.database_manager import DatabaseManager
 from managers.storage_manager import SnapshotStorageManager, start_snapshot_cleanup_thread
 
+@functools.lru_cache(maxsize=1)
+def _build_test_frames():
+    """Render the left-to-right test sequence once as a shared read-only array"""
+    # 3 frames without a person, 4 with a person moving left to right, 3 without
+    frames = np.zeros((10, 480, 640, 3), dtype=np.uint8)
+    
+    # Green box spanning columns offset..offset+100 and rows 200..350 in frames 3-6,
+    # written for all four frames at once via broadcast indexing
+    offsets = np.arange(4) * 100
+    columns = offsets[:, None] + np.arange(101)
+    frames[np.arange(3, 7)[:, None, None], np.arange(200, 351)[None, :, None], columns[:, None, :], 1] = 255
+    frames.flags.writeable = False
+    return frames
+
 class MockCamera:
     """Mock camera for integration testing"""
     def __init__(self, camera_id, test_frames):
@@ -28,6 +43,8 @@ class MockCamera:
         self.is_running = True
         self.name = f"Camera {camera_id}"
         self.device_id = f"test_{camera_id}"
+        # Set each time the frame sequence wraps around
+        self._seq_done = threading.Event()
         
     def get_latest_frame(self):
         """Return current test frame"""
@@ -36,6 +53,8 @@ class MockCamera:
         
         frame = self.test_frames[self.current_frame_idx]
         self.current_frame_idx = (self.current_frame_idx + 1) % len(self.test_frames)
+        if self.current_frame_idx == 0:
+            self._seq_done.set()
         return frame
     
     def start(self):
@@ -70,7 +89,8 @@ class TestIntegrationSnapshot(unittest.TestCase):
         """Set up test environment before each test"""
         # Create a temporary directory for test files
         self.temp_dir = tempfile.mkdtemp()
-        self.db_path = os.path.join(self.temp_dir, "test.db")
+        # Shared-cache in-memory database, unique per test run
+        self.db_path = f"file:{os.path.basename(self.temp_dir)}?mode=memory&cache=shared"
         self.snapshot_dir = os.path.join(self.temp_dir, "snapshots")
         os.makedirs(self.snapshot_dir, exist_ok=True)
         
@@ -79,21 +99,8 @@ class TestIntegrationSnapshot(unittest.TestCase):
         self.frame_with_person = np.zeros((480, 640, 3), dtype=np.uint8)
         cv2.rectangle(self.frame_with_person, (100, 100), (300, 300), (255, 255, 255), -1)
         
-        # Create test frames sequence for left-to-right movement
-        self.test_frames = []
-        for i in range(10):
-            # First 3 frames without person
-            if i < 3:
-                self.test_frames.append(self.frame_without_person.copy())
-            # Next 4 frames with person moving left to right
-            elif i < 7:
-                frame = self.frame_without_person.copy()
-                offset = (i - 3) * 100
-                cv2.rectangle(frame, (offset, 200), (offset + 100, 350), (0, 255, 0), -1)
-                self.test_frames.append(frame)
-            # Last 3 frames without person
-            else:
-                self.test_frames.append(self.frame_without_person.copy())
+        # Test frames sequence for left-to-right movement (shared, read-only views)
+        self.test_frames = _build_test_frames()
         
         # Create mock cameras
         self.cameras = {
@@ -207,7 +214,7 @@ class TestIntegrationSnapshot(unittest.TestCase):
     
     def _verify_database_entries(self, expected_count=None):
         """Verify that database entries were created for snapshots"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, uri=True)
         cursor = conn.cursor()
         
         # Get detection events with snapshot paths
@@ -236,18 +243,20 @@ class TestIntegrationSnapshot(unittest.TestCase):
     def test_complete_snapshot_workflow(self):
         """Test the complete snapshot workflow - capture, database logging, and FIFO cleanup"""
         # Start cleanup thread
-        cleanup_thread = start_snapshot_cleanup_thread(
+        cleanup_thread, cleanup_stop_event = start_snapshot_cleanup_thread(
             directory=self.snapshot_dir,
             max_files=5,  # Very small to test FIFO quickly
             interval=1,   # 1 second to test quickly
             logger=self.mock_rp.get_logger()
         )
+        self.addCleanup(cleanup_stop_event.set)
         
         # Start detection for main camera
         self.detection_manager.start_camera('main')
         
-        # Wait for detection to process frames
-        time.sleep(3)
+        # Wait for detection to process the whole frame sequence
+        self.cameras['main']._seq_done.wait(timeout=3)
+        self.cameras['main']._seq_done.clear()
         
         # Stop detection
         self.detection_manager.stop_camera('main')
@@ -271,17 +280,22 @@ class TestIntegrationSnapshot(unittest.TestCase):
             # Start detection again
             self.detection_manager.start_camera('main')
             
-            # Wait for detection to process frames
-            time.sleep(2)
+            # Wait for detection to process the whole frame sequence
+            self.cameras['main']._seq_done.wait(timeout=2)
+            self.cameras['main']._seq_done.clear()
             
             # Stop detection
             self.detection_manager.stop_camera('main')
         
         # Wait for cleanup thread to run
-        time.sleep(2)
+        deadline = time.monotonic() + 2
+        while True:
+            snapshots = [f for f in os.listdir(self.snapshot_dir) if f.endswith('.jpg')]
+            if len(snapshots) <= 5 or time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
         
         # Count snapshots - should be capped at max_files (5)
-        snapshots = [f for f in os.listdir(self.snapshot_dir) if f.endswith('.jpg')]
         self.assertLessEqual(len(snapshots), 5, f"FIFO cleanup failed, found {len(snapshots)} snapshots, expected <= 5")
         
         # Verify the newest snapshots were kept
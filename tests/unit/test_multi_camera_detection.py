@@ -12,7 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from managers.resource_provider import ResourceProvider
 from managers.camera_registry import CameraRegistry
-from managers.detection_manager import DetectionManager
+from managers.detection_manager import DetectionManager, RoiSetting, _CameraState
 from managers.dashboard_manager import DashboardManager
 from managers.database_manager import DatabaseManager
 
@@ -103,12 +103,7 @@ class TestMultiCameraDetection(unittest.TestCase):
         
         # Initialize state for tests
         self.detection_manager.states = {
-            "main": {
-                "person_detected": False,
-                "last_detection_time": None,
-                "current_direction": self.detection_manager.DIRECTION_UNKNOWN,
-                "no_person_counter": 0
-            }
+            "main": _CameraState()
         }
     
     def test_start_all_cameras(self):
@@ -155,16 +150,48 @@ class TestMultiCameraDetection(unittest.TestCase):
             # Check that the detection thread was removed from the dictionary
             self.assertNotIn("main", self.detection_manager.detection_threads)
     
+    def test_stop_camera_during_inference(self):
+        """
+        Test that a frame still being processed when its camera is stopped
+        cannot mark the camera as detected again
+        """
+        processing = threading.Event()
+        
+        def slow_process_frame(frame, camera_id, now=None):
+            if camera_id == "secondary":
+                processing.set()
+                time.sleep(0.2)
+                self.detection_manager._update_detection_state(camera_id, True, frame, 200, now)
+        
+        self.detection_manager._process_frame = slow_process_frame
+        self.detection_manager._save_snapshot = MagicMock(return_value=None)
+        self.detection_manager.is_running = True
+        
+        # Put both cameras on one worker so stopping one does not stop the worker
+        self.detection_manager.max_workers = 1
+        self.detection_manager._shards = [[]]
+        self.detection_manager._worker_threads = [None]
+        
+        self.detection_manager.start_camera("main")
+        self.detection_manager.start_camera("secondary")
+        try:
+            self.assertTrue(processing.wait(timeout=2.0))
+            self.detection_manager.stop_camera("secondary")
+            time.sleep(0.3)
+            
+            self.assertNotIn("secondary", self.detection_manager.detection_threads)
+            self.assertFalse(self.detection_manager.is_person_detected("secondary"))
+            self.assertFalse(self.detection_manager.is_person_detected())
+        finally:
+            self.detection_manager.stop_all()
+    
     def test_process_frame_with_roi(self):
         """
         Test processing a frame with ROI
         """
         # Set up ROI for the camera
         self.detection_manager.roi_settings = {
-            "main": {
-                "coords": (50, 50, 400, 450),  # This includes the person
-                "entry_direction": "LTR"
-            }
+            "main": RoiSetting((50, 50, 400, 450), "LTR")  # This includes the person
         }
         
         # Create a direct implementation of _update_detection_state to capture args
@@ -138,8 +138,8 @@ class TestSnapshotCapture(unittest.TestCase):
             # Now simulate person disappearing
             # We need to set no_person_counter to 5 to trigger the "person gone" logic
             camera_state = self.detection_manager.states['main']
-            camera_state['person_detected'] = True
-            camera_state['no_person_counter'] = 5
+            camera_state.person_detected = True
+            camera_state.no_person_counter = 5
             
             # Update state with person_present=False
             self.detection_manager._update_detection_state('main', False, self.test_frame, None)
@@ -139,6 +139,33 @@ class TestStorageManager(unittest.TestCase):
         # Run FIFO enforcement (should not raise any errors)
         storage_manager.enforce_fifo()
     
+    def test_enforce_fifo_registered_index(self):
+        """Test that registered snapshots are trimmed from the index without a rescan"""
+        camera_dir = os.path.join(self.temp_dir, "indexed", "cam1")
+        os.makedirs(camera_dir, exist_ok=True)
+        storage_manager = SnapshotStorageManager(directory=os.path.dirname(camera_dir), max_files=5)
+        
+        def write_snapshot(i):
+            filename = os.path.join(camera_dir, f"snapshot_{i:02d}.jpg")
+            with open(filename, 'w') as f:
+                f.write(f"Test snapshot {i}")
+            os.utime(filename, (1000 + i, 1000 + i))
+            storage_manager.register("cam1", filename, 1000 + i)
+        
+        # First run scans the directory and builds the index
+        for i in range(8):
+            write_snapshot(i)
+        storage_manager.enforce_fifo()
+        self.assertEqual(sorted(os.listdir(camera_dir)), [f"snapshot_{i:02d}.jpg" for i in range(3, 8)])
+        
+        # Later runs trim the oldest indexed entries without scanning the directory
+        for i in range(8, 11):
+            write_snapshot(i)
+        with patch('managers.storage_manager._fast_mtime') as mock_mtime:
+            storage_manager.enforce_fifo()
+            mock_mtime.assert_not_called()
+        self.assertEqual(sorted(os.listdir(camera_dir)), [f"snapshot_{i:02d}.jpg" for i in range(6, 11)])
+    
     @patch('threading.Thread')
     def test_cleanup_thread(self, mock_thread):
         """Test that the cleanup thread is started correctly"""